@@ -44,3 +44,36 @@ def make_strat_image(rows: Iterable[dict], title: str = "Intervals") -> bytes:
     fig.savefig(buf, format="png", dpi=110, bbox_inches="tight")
     plt.close(fig)
     return buf.getvalue()
+
+
+def make_gun_barrel_image(section: dict, title: str = "Gun Barrel") -> bytes:
+    """
+    section: output of gun_barrel.gun_barrel (wells + bench bands).
+    Returns: PNG bytes with offset (ft) across and TVD (ft) down.
+    """
+    fig = plt.figure(figsize=(7.0, 5.5), dpi=110)
+    ax = fig.add_axes([0.12, 0.1, 0.84, 0.82])
+
+    wells = [w for w in section.get("wells", []) if w.get("tvd_ft") is not None]
+    bands = section.get("bands", [])
+    if not wells:
+        ax.text(0.5, 0.5, "No laterals cross this section", ha="center", va="center")
+        ax.axis("off")
+    else:
+        for b in bands:
+            ax.axhspan(b["top_ft"], b["base_ft"], color="#BFD9FF", alpha=0.35, linewidth=0)
+            ax.text(0.01, (b["top_ft"] + b["base_ft"]) / 2, b["bench"],
+                    transform=ax.get_yaxis_transform(), fontsize=8, va="center")
+        xs = [w["offset_ft"] for w in wells]
+        ys = [w["tvd_ft"] for w in wells]
+        ax.scatter(xs, ys, s=36, color="#2563EB", edgecolor="black", linewidth=0.6, zorder=3)
+        ax.invert_yaxis()
+        ax.set_xlabel("Offset along section (ft)")
+        ax.set_ylabel("TVD (ft)")
+
+    ax.set_title(title, fontsize=12)
+
+    buf = BytesIO()
+    fig.savefig(buf, format="png", dpi=110, bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
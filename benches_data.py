@@ -164,5 +164,9 @@ def benches_for_basin(df: pd.DataFrame, basin: str) -> pd.DataFrame:
         sub = sub.sort_values(["display_order","group","bench"])
     return sub
 
+def bench_key(name) -> str:
+    """Normalise a bench/interval name for matching ("Wolfcamp A" == "WOLFCAMP_A")."""
+    return "".join(ch for ch in str(name).lower() if ch.isalnum())
+
 def phase_to_color(phase_tag: str) -> str:
     return PHASE_COLORS.get(str(phase_tag), "#999999")
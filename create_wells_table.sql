@@ -265,7 +265,8 @@ CREATE TABLE wells (
   "TestRate_MCFEPerDAYPer1000FT" TEXT,
   "FirstProdYear" TEXT,
   basin TEXT NOT NULL,
-  geom GEOGRAPHY(Point, 4326)
+  geom GEOGRAPHY(Point, 4326),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
 CREATE OR REPLACE FUNCTION set_geom()
@@ -284,3 +285,20 @@ FOR EACH ROW EXECUTE PROCEDURE set_geom();
 
 CREATE INDEX wells_geom_idx   ON wells USING GIST (geom);
 CREATE INDEX wells_basin_idx  ON wells (basin);
+
+-- High-water mark for the app's delta sync (wells_sync.py). This is the
+-- write time, not the commit time, so the sync re-reads a safety window
+-- (WELLS_SYNC_OVERLAP_S) behind its mark to catch slow transactions.
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.updated_at := clock_timestamp();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER wells_updated_at_trigger
+BEFORE INSERT OR UPDATE ON wells
+FOR EACH ROW EXECUTE PROCEDURE set_updated_at();
+
+CREATE INDEX wells_updated_at_idx ON wells (updated_at, id);
@@ -19,9 +19,10 @@ def map_dtype(dtype):
 # 3. Infer SQL column definitions
 cols = [f'  "{c}" {map_dtype(df[c].dtype)}' for c in df.columns]
 
-# 4. Add basin + geom columns
+# 4. Add basin + geom + change-tracking columns
 cols.append('  basin TEXT NOT NULL')
 cols.append('  geom GEOGRAPHY(Point, 4326)')
+cols.append('  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()')
 
 # 5. Build CREATE TABLE
 table_sql = "CREATE TABLE wells (\n  id BIGSERIAL PRIMARY KEY,\n" + ",\n".join(cols) + "\n);"
@@ -44,6 +45,23 @@ FOR EACH ROW EXECUTE PROCEDURE set_geom();
 
 CREATE INDEX wells_geom_idx   ON wells USING GIST (geom);
 CREATE INDEX wells_basin_idx  ON wells (basin);
+
+-- High-water mark for the app's delta sync (wells_sync.py). This is the
+-- write time, not the commit time, so the sync re-reads a safety window
+-- (WELLS_SYNC_OVERLAP_S) behind its mark to catch slow transactions.
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.updated_at := clock_timestamp();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER wells_updated_at_trigger
+BEFORE INSERT OR UPDATE ON wells
+FOR EACH ROW EXECUTE PROCEDURE set_updated_at();
+
+CREATE INDEX wells_updated_at_idx ON wells (updated_at, id);
 """
 
 # 7. Write to file
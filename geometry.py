@@ -0,0 +1,123 @@
+# geometry.py
+from __future__ import annotations
+import numpy as np
+
+# Points are tested against polygon edges in blocks whose (points x edges)
+# matrices hold at most this many cells, so a 10k-vertex polygon gets
+# 200-row blocks instead of a 1024 x 10k matrix per temporary.
+BLOCK_CELLS = 2_000_000
+
+
+def parse_polygon(geojson: dict) -> list[list[np.ndarray]]:
+    """
+    Accept a GeoJSON Polygon / MultiPolygon (or Feature wrapping one).
+    Returns a list of polygons, each a list of (n, 2) lon/lat rings.
+    """
+    if geojson.get("type") == "Feature":
+        geojson = geojson.get("geometry") or {}
+    gtype = geojson.get("type")
+    coords = geojson.get("coordinates") or []
+    if gtype == "Polygon":
+        polys = [coords]
+    elif gtype == "MultiPolygon":
+        polys = coords
+    else:
+        raise ValueError(f"Expected a Polygon or MultiPolygon, got {gtype!r}")
+    out = []
+    for rings in polys:
+        parsed = [np.asarray(r, dtype=np.float64)[:, :2] for r in rings if len(r) >= 3]
+        if parsed:
+            out.append(parsed)
+    if not out:
+        raise ValueError("Polygon has no usable rings")
+    return out
+
+
+def _edges(ring: np.ndarray):
+    x1, y1 = ring[:, 0], ring[:, 1]
+    return x1, y1, np.roll(x1, -1), np.roll(y1, -1)
+
+
+def _blocks(key: np.ndarray, n_edges: int):
+    """Row indices in blocks sized to BLOCK_CELLS, ordered by key so each block is compact."""
+    rows = max(1, BLOCK_CELLS // max(1, n_edges))
+    order = np.argsort(key, kind="stable")
+    for s in range(0, len(order), rows):
+        yield order[s:s + rows]
+
+
+def points_in_rings(x: np.ndarray, y: np.ndarray, rings: list[np.ndarray]) -> np.ndarray:
+    """Even-odd point-in-polygon, vectorized over points and edges (holes work)."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    inside = np.zeros(len(x), dtype=bool)
+    finite = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for ring in rings:
+            x1, y1, x2, y2 = _edges(ring)
+            e_lo, e_hi, e_right = np.minimum(y1, y2), np.maximum(y1, y2), np.maximum(x1, x2)
+            for block in _blocks(y[finite], len(x1)):
+                idx = finite[block]
+                px, py = x[idx], y[idx]
+                # Only edges spanning the block's y range and reaching right of
+                # its leftmost point can be crossed by a ray going +x
+                use = (e_hi > py.min()) & (e_lo <= py.max()) & (e_right >= px.min())
+                if not use.any():
+                    continue
+                ex1, ey1, ex2, ey2 = x1[use], y1[use], x2[use], y2[use]
+                px, py = px[:, None], py[:, None]
+                spans = (ey1 > py) != (ey2 > py)
+                x_cross = (ex2 - ex1) * (py - ey1) / (ey2 - ey1) + ex1
+                inside[idx] ^= np.count_nonzero(spans & (px < x_cross), axis=1) % 2 == 1
+    return inside
+
+
+def _cross(ax, ay, bx, by):
+    return ax * by - ay * bx
+
+
+def segments_cross_rings(ax, ay, bx, by, rings: list[np.ndarray]) -> np.ndarray:
+    """True where segment (a -> b) crosses any polygon edge."""
+    ax, ay, bx, by = (np.asarray(v, dtype=np.float64) for v in (ax, ay, bx, by))
+    hit = np.zeros(len(ax), dtype=bool)
+    finite = np.flatnonzero(np.isfinite(ax) & np.isfinite(ay) & np.isfinite(bx) & np.isfinite(by))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for ring in rings:
+            x1, y1, x2, y2 = _edges(ring)
+            e_x0, e_x1 = np.minimum(x1, x2), np.maximum(x1, x2)
+            e_y0, e_y1 = np.minimum(y1, y2), np.maximum(y1, y2)
+            for block in _blocks((ay[finite] + by[finite]) / 2, len(x1)):
+                idx = finite[block]
+                sax, say, sbx, sby = ax[idx], ay[idx], bx[idx], by[idx]
+                # Skip edges outside the block's segment bounding box
+                use = (
+                    (e_x1 >= min(sax.min(), sbx.min())) & (e_x0 <= max(sax.max(), sbx.max()))
+                    & (e_y1 >= min(say.min(), sby.min())) & (e_y0 <= max(say.max(), sby.max()))
+                )
+                if not use.any():
+                    continue
+                ex, ey = (x2 - x1)[use], (y2 - y1)[use]
+                dx, dy = (sbx - sax)[:, None], (sby - say)[:, None]
+                qx, qy = x1[use] - sax[:, None], y1[use] - say[:, None]
+                denom = _cross(dx, dy, ex, ey)
+                t = _cross(qx, qy, ex, ey) / denom
+                u = _cross(qx, qy, dx, dy) / denom
+                hit[idx] |= np.any((t >= 0) & (t <= 1) & (u >= 0) & (u <= 1), axis=1)
+    return hit
+
+
+def segments_cross_line(ax, ay, bx, by, p: tuple[float, float], q: tuple[float, float]):
+    """
+    Intersect N segments (a -> b) with one segment p -> q.
+    Returns (mask, s) where s is the fractional position along p -> q.
+    """
+    ax, ay, bx, by = (np.asarray(v, dtype=np.float64) for v in (ax, ay, bx, by))
+    ex, ey = q[0] - p[0], q[1] - p[1]
+    dx, dy = bx - ax, by - ay
+    qx, qy = p[0] - ax, p[1] - ay
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = _cross(dx, dy, ex, ey)
+        t = _cross(qx, qy, ex, ey) / denom
+        s = _cross(qx, qy, dx, dy) / denom
+    mask = (t >= 0) & (t <= 1) & (s >= 0) & (s <= 1)
+    return mask, s
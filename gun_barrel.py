@@ -0,0 +1,199 @@
+# gun_barrel.py
+from __future__ import annotations
+import copy
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from benches_data import bench_key, load_benches, benches_for_basin
+from geometry import parse_polygon, segments_cross_line
+from wells_index import rows_within
+from wells_loader import WellSnapshot, current_snapshot
+from well_store import KEY_COLUMN
+
+SECTION_CACHE_SIZE = 256
+COORD_DECIMALS = 5  # ~1 m; section requests are rounded to this before caching
+
+
+# ===============================================================
+# Bench depth bands
+# ===============================================================
+def bench_bands(basin: str, interval: pd.Series, tvd: np.ndarray) -> pd.DataFrame:
+    """
+    Depth band per IntervalSelector bench: centred on the median TVD of
+    wells landed in that bench, as tall as the bench thickness.
+    """
+    rows = benches_for_basin(load_benches(), basin)
+    landed = interval.astype(str).map(bench_key).to_numpy()
+    bands = []
+    for r in rows.to_dict("records"):
+        bench = str(r.get("bench", ""))
+        thk = r.get("thickness_ft")
+        thk = float(thk) if thk not in (None, "", "None") and pd.notna(thk) else 100.0
+        sel = (landed == bench_key(bench)) & np.isfinite(tvd)
+        if not sel.any():
+            continue
+        mid = float(np.median(tvd[sel]))
+        bands.append({
+            "bench": bench,
+            "group": r.get("group"),
+            "display_order": int(r.get("display_order", 0)),
+            "top_ft": mid - thk / 2,
+            "base_ft": mid + thk / 2,
+        })
+    return pd.DataFrame(bands, columns=["bench", "group", "display_order", "top_ft", "base_ft"])
+
+
+def assign_benches(interval: pd.Series, tvd: np.ndarray, bands: pd.DataFrame) -> np.ndarray:
+    """Bench per lateral: reported interval when it matches a bench, else TVD band."""
+    out = np.full(len(tvd), None, dtype=object)
+    if bands.empty:
+        return out
+    by_name = {bench_key(b): b for b in bands["bench"]}
+    landed = interval.astype(str).map(bench_key).to_numpy()
+    for i, key in enumerate(landed):
+        out[i] = by_name.get(key)
+    missing = np.flatnonzero((out == None) & np.isfinite(tvd))  # noqa: E711
+    if len(missing):
+        top = bands["top_ft"].to_numpy()
+        base = bands["base_ft"].to_numpy()
+        inside = (tvd[missing, None] >= top) & (tvd[missing, None] <= base)
+        first = inside.argmax(axis=1)
+        found = inside.any(axis=1)
+        out[missing[found]] = bands["bench"].to_numpy()[first[found]]
+    return out
+
+
+# ===============================================================
+# Section computation
+# ===============================================================
+def _normal_offsets(part: pd.DataFrame, rows: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Distance of points (x, y) along the normal to the median lateral azimuth
+    of `rows`, so offsets are true well-to-well spacing whatever the cut angle.
+    """
+    dx = (part["toe_x"].to_numpy()[rows] - part["heel_x"].to_numpy()[rows]).astype(np.float64)
+    dy = (part["toe_y"].to_numpy()[rows] - part["heel_y"].to_numpy()[rows]).astype(np.float64)
+    az = np.arctan2(dy, dx) % np.pi  # laterals drilled either way share an azimuth
+    theta = float(np.median(az[np.isfinite(az)])) if np.isfinite(az).any() else 0.0
+    offset = x * -np.sin(theta) + y * np.cos(theta)
+    return offset - offset.min()
+
+
+def _section_from_line(snap: WellSnapshot, basin: str, line: tuple):
+    (lon1, lat1), (lon2, lat2) = line
+    px, py = snap.project(basin, [lon1, lon2], [lat1, lat2])
+    p, q = (float(px[0]), float(py[0])), (float(px[1]), float(py[1]))
+    part = snap.basin_frame(basin)
+    mask, s = segments_cross_line(
+        part["heel_x"], part["heel_y"], part["toe_x"], part["toe_y"], p, q
+    )
+    rows = np.flatnonzero(mask)
+    if not len(rows):
+        return rows, np.zeros(0)
+    # Where each lateral crosses the section line
+    cx = p[0] + s[rows] * (q[0] - p[0])
+    cy = p[1] + s[rows] * (q[1] - p[1])
+    return rows, _normal_offsets(part, rows, cx, cy)
+
+
+def _section_from_polygon(snap: WellSnapshot, basin: str, rings: tuple):
+    """Every lateral intersecting the polygon (same test as /wells/within)."""
+    polygon = {"type": "Polygon", "coordinates": [list(r) for r in rings]}
+    hits = dict(rows_within(snap, polygon, [basin]))
+    rows = hits.get(basin, np.zeros(0, dtype=int))
+    if not len(rows):
+        return rows, np.zeros(0)
+    part = snap.basin_frame(basin)
+    mx = part["mid_x"].to_numpy(dtype=np.float64)[rows]
+    my = part["mid_y"].to_numpy(dtype=np.float64)[rows]
+    # Parallel laterals share a normal offset along their length, so midpoints do
+    return rows, _normal_offsets(part, rows, mx, my)
+
+
+def _build_section(basin: str, line: tuple | None, rings: tuple | None) -> dict:
+    snap = current_snapshot()
+    if line is not None:
+        rows, offset = _section_from_line(snap, basin, line)
+    else:
+        rows, offset = _section_from_polygon(snap, basin, rings)
+
+    part = snap.basin_frame(basin)
+    tvd_all, interval_all = _depths(part)
+    bands = _basin_bands(basin, snap.basin_stamp(basin))
+
+    order = np.argsort(offset, kind="stable")
+    rows, offset = rows[order], offset[order]
+    tvd = tvd_all[rows]
+    interval = interval_all.iloc[rows].reset_index(drop=True)
+    bench = assign_benches(interval, tvd, bands)
+
+    wells = pd.DataFrame({
+        "api_uwi": part[KEY_COLUMN].iloc[rows].astype(str).to_numpy(),
+        "well_name": part["WellName"].iloc[rows].astype(str).to_numpy() if "WellName" in part else None,
+        "offset_ft": np.round(offset, 1),
+        "tvd_ft": np.round(tvd, 1),
+        "bench": bench,
+    })
+    wells["dx_prev_ft"] = wells["offset_ft"].diff().round(1)
+    wells["dz_prev_ft"] = wells["tvd_ft"].diff().round(1)
+
+    # Same-bench horizontal spacing between adjacent laterals
+    spacing = []
+    for b, grp in wells.dropna(subset=["bench"]).groupby("bench", sort=False):
+        gaps = grp["offset_ft"].diff().dropna()
+        spacing.append({
+            "bench": b,
+            "laterals": len(grp),
+            "median_spacing_ft": round(float(gaps.median()), 1) if len(gaps) else None,
+            "min_spacing_ft": round(float(gaps.min()), 1) if len(gaps) else None,
+        })
+
+    return {
+        "basin": basin,
+        "count": len(wells),
+        "wells": wells.replace({np.nan: None}).to_dict(orient="records"),
+        "bands": bands.to_dict(orient="records"),
+        "spacing_by_bench": spacing,
+    }
+
+
+def _depths(part: pd.DataFrame) -> tuple[np.ndarray, pd.Series]:
+    tvd = part["TVD_FT"].to_numpy(dtype=np.float64) if "TVD_FT" in part else np.full(len(part), np.nan)
+    interval = part["ENVInterval"] if "ENVInterval" in part else pd.Series([None] * len(part))
+    return tvd, interval
+
+
+@lru_cache(maxsize=32)
+def _basin_bands(basin: str, basin_stamp: float) -> pd.DataFrame:
+    tvd, interval = _depths(current_snapshot().basin_frame(basin))
+    return bench_bands(basin, interval, tvd)
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _cached_section(basin: str, line: tuple | None, rings: tuple | None, basin_stamp: float) -> dict:
+    return _build_section(basin, line, rings)
+
+
+def _round_coords(coords) -> tuple:
+    return tuple((round(float(c[0]), COORD_DECIMALS), round(float(c[1]), COORD_DECIMALS)) for c in coords)
+
+
+def gun_barrel(basin: str, line=None, polygon: dict | None = None) -> dict:
+    """
+    Gun-barrel view for a section line [(lon, lat), (lon, lat)] or a GeoJSON
+    polygon. Repeat requests for the same section are served from cache
+    (each caller gets its own copy).
+    """
+    if (line is None) == (polygon is None):
+        raise ValueError("Pass exactly one of line or polygon")
+    snap = current_snapshot()
+    if basin not in snap.partitions.index:
+        raise ValueError(f"Unknown basin {basin!r}")
+    if line is not None:
+        if len(line) != 2:
+            raise ValueError("A section line needs exactly two points")
+        key_line, key_rings = _round_coords(line), None
+    else:
+        rings = [ring for poly in parse_polygon(polygon) for ring in poly]
+        key_line, key_rings = None, tuple(_round_coords(r) for r in rings)
+    return copy.deepcopy(_cached_section(basin, key_line, key_rings, snap.basin_stamp(basin)))
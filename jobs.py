@@ -0,0 +1,302 @@
+# jobs.py
+from __future__ import annotations
+import hashlib
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+JOBS_MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", "1"))
+JOBS_RESULT_CACHE = int(os.getenv("JOBS_RESULT_CACHE", "64"))
+JOBS_KEEP_FINISHED = 500
+
+# Per-kind limits on how many jobs may run at once (default: pool size)
+KIND_LIMITS = {"snapshot": 1, "rebuild_basin": 1}
+# Kinds whose point is a side effect (a fresh build) must always run
+UNCACHED_KINDS = {"snapshot", "rebuild_basin"}
+
+# ===============================================================
+# Worker side
+# ===============================================================
+_progress_queue = None
+_current_job: str | None = None
+_after_job: Callable | None = None
+
+
+def _init_worker(progress_queue, worker_init: Callable | None, after_job: Callable | None):
+    global _progress_queue, _after_job
+    _progress_queue = progress_queue
+    _after_job = after_job
+    if worker_init is not None:
+        worker_init()
+
+
+def report_progress(done: float, total: float | None = None):
+    """Call from inside a job to publish progress (0..1 or done/total)."""
+    if _progress_queue is None or _current_job is None:
+        return
+    frac = done / total if total else done
+    try:
+        _progress_queue.put_nowait((_current_job, float(min(1.0, max(0.0, frac)))))
+    except Exception:
+        pass
+
+
+def _run_job(job_id: str, fn: Callable, args: tuple, kwargs: dict):
+    global _current_job
+    _current_job = job_id
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _current_job = None
+        if _after_job is not None:
+            _after_job()
+
+
+# ===============================================================
+# Scheduler
+# ===============================================================
+@dataclass
+class Job:
+    id: str
+    kind: str
+    key: str
+    priority: int
+    fn: Callable = field(repr=False)
+    args: tuple = field(repr=False, default=())
+    kwargs: dict = field(repr=False, default_factory=dict)
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    progress: float = 0.0
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+    result: Any = field(repr=False, default=None)
+    cached: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "priority": self.priority,
+            "progress": round(self.progress, 3),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "cached": self.cached,
+        }
+
+
+def job_key(kind: str, fn: Callable, args: tuple, kwargs: dict, stamp: Any = None) -> str:
+    """Hash of the job's inputs (and data stamp); identical submissions share one job/result."""
+    payload = json.dumps(
+        [kind, f"{fn.__module__}.{fn.__qualname__}", args, kwargs, stamp], sort_keys=True, default=str
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class JobScheduler:
+    """
+    In-process scheduler over a ProcessPoolExecutor. Jobs are deduplicated
+    by input hash, dispatched by priority within per-kind concurrency
+    limits, and their results are kept in an LRU cache keyed by that hash
+    plus `cache_stamp()`, the version of the data the workers read.
+    Running jobs cannot be interrupted; cancelling one discards its result.
+    `worker_init` runs once in each worker, `after_job` after every job.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = JOBS_MAX_WORKERS,
+        result_cache: int = JOBS_RESULT_CACHE,
+        cache_stamp: Callable[[], Any] | None = None,
+        worker_init: Callable | None = None,
+        after_job: Callable | None = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self._cache_stamp = cache_stamp
+        self._worker_init = worker_init
+        self._after_job = after_job
+        self._ctx = multiprocessing.get_context("spawn")  # no fork of uvicorn/Flet threads
+        self._progress = None  # created on first submit; spawned workers re-import main
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.RLock()
+        self._seq = itertools.count()
+        self._pending: list[tuple[int, int, str]] = []
+        self._running: dict[str, Job] = {}
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self._active_by_key: dict[str, str] = {}
+        self._results: OrderedDict[str, Any] = OrderedDict()
+        self._result_cache = result_cache
+        self._callbacks: dict[str, list[Callable[[Job], None]]] = {}
+
+    # ---------- Public API ----------
+    def on_done(self, kind: str, callback: Callable[[Job], None]):
+        """Run callback(job) in the parent process when a job of `kind` succeeds."""
+        self._callbacks.setdefault(kind, []).append(callback)
+
+    def submit(self, kind: str, fn: Callable, *args, priority: int = 0, **kwargs) -> Job:
+        stamp = self._cache_stamp() if self._cache_stamp and kind not in UNCACHED_KINDS else None
+        key = job_key(kind, fn, args, kwargs, stamp)
+        with self._lock:
+            active = self._active_by_key.get(key)
+            if active and active in self.jobs:
+                return self.jobs[active]
+            job = Job(id=uuid.uuid4().hex[:12], kind=kind, key=key, priority=priority,
+                      fn=fn, args=args, kwargs=kwargs)
+            self.jobs[job.id] = job
+            if key in self._results and kind not in UNCACHED_KINDS:
+                self._results.move_to_end(key)
+                job.result, job.status, job.cached = self._results[key], "done", True
+                job.progress, job.finished_at = 1.0, time.time()
+                self._trim()
+                return job
+            self._active_by_key[key] = job.id
+            heapq.heappush(self._pending, (-priority, next(self._seq), job.id))
+            self._dispatch()
+            return job
+
+    def status(self, job_id: str) -> dict | None:
+        job = self.jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def list(self, kind: str | None = None) -> list[dict]:
+        with self._lock:
+            return [j.to_dict() for j in self.jobs.values() if kind in (None, j.kind)]
+
+    def get(self, job_id: str) -> Job | None:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status not in ("queued", "running"):
+                return False
+            job.status, job.finished_at = "cancelled", time.time()
+            if self._active_by_key.get(job.key) == job_id:
+                self._active_by_key.pop(job.key)
+            self._pending = [p for p in self._pending if p[2] != job_id]
+            heapq.heapify(self._pending)
+            return True
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ---------- Internals ----------
+    def _pool_or_start(self) -> ProcessPoolExecutor:
+        if self._progress is None:
+            self._progress = self._ctx.Queue()
+            threading.Thread(target=self._drain_progress, name="jobs-progress", daemon=True).start()
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self._ctx,
+                initializer=_init_worker,
+                initargs=(self._progress, self._worker_init, self._after_job),
+            )
+        return self._pool
+
+    def _reset_pool(self, broken: ProcessPoolExecutor | None):
+        """Drop a pool whose worker died (e.g. OOM-killed); the next dispatch starts a new one."""
+        with self._lock:
+            if broken is not None and self._pool is broken:
+                print("⚠️ Job worker died; restarting the process pool")
+                self._pool = None
+                broken.shutdown(wait=False, cancel_futures=True)
+
+    def _submit_to_pool(self, job: Job):
+        for attempt in range(2):
+            pool = self._pool_or_start()
+            try:
+                return pool, pool.submit(_run_job, job.id, job.fn, job.args, job.kwargs)
+            except BrokenProcessPool:
+                self._reset_pool(pool)
+        raise BrokenProcessPool("process pool could not be restarted")
+
+    def _kind_running(self, kind: str) -> int:
+        return sum(1 for j in self._running.values() if j.kind == kind)
+
+    def _dispatch(self):
+        with self._lock:
+            deferred = []
+            while self._pending and len(self._running) < self.max_workers:
+                item = heapq.heappop(self._pending)
+                job = self.jobs.get(item[2])
+                if job is None or job.status != "queued":
+                    continue
+                if self._kind_running(job.kind) >= KIND_LIMITS.get(job.kind, self.max_workers):
+                    deferred.append(item)
+                    continue
+                try:
+                    pool, fut = self._submit_to_pool(job)
+                except BrokenProcessPool as e:
+                    job.status, job.error, job.finished_at = "failed", str(e), time.time()
+                    if self._active_by_key.get(job.key) == job.id:
+                        self._active_by_key.pop(job.key)
+                    print(f"❌ Job {job.kind}/{job.id} failed: {job.error}")
+                    continue
+                job.status, job.started_at = "running", time.time()
+                self._running[job.id] = job
+                fut.add_done_callback(lambda f, j=job, p=pool: self._finished(j, f, p))
+            for item in deferred:
+                heapq.heappush(self._pending, item)
+
+    def _finished(self, job: Job, fut, pool: ProcessPoolExecutor | None = None):
+        callbacks = []
+        error = "process pool shut down" if fut.cancelled() else fut.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._reset_pool(pool)
+        with self._lock:
+            self._running.pop(job.id, None)
+            if self._active_by_key.get(job.key) == job.id:
+                self._active_by_key.pop(job.key)
+            if job.status == "cancelled":
+                pass
+            elif error is not None:
+                job.status, job.error = "failed", str(error) or type(error).__name__
+                print(f"❌ Job {job.kind}/{job.id} failed: {job.error}")
+            else:
+                job.result, job.status, job.progress = fut.result(), "done", 1.0
+                self._results[job.key] = job.result
+                self._results.move_to_end(job.key)
+                while len(self._results) > self._result_cache:
+                    self._results.popitem(last=False)
+                callbacks = list(self._callbacks.get(job.kind, []))
+            job.finished_at = time.time()
+            self._trim()
+        for cb in callbacks:
+            try:
+                cb(job)
+            except Exception as e:
+                print(f"⚠️ Job {job.kind}/{job.id} callback failed: {e}")
+        self._dispatch()
+
+    def _trim(self):
+        finished = [j.id for j in self.jobs.values() if j.finished_at is not None]
+        for job_id in finished[:max(0, len(finished) - JOBS_KEEP_FINISHED)]:
+            del self.jobs[job_id]
+
+    def _drain_progress(self):
+        while True:
+            try:
+                job_id, frac = self._progress.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            job = self.jobs.get(job_id)
+            if job is not None and job.status == "running":
+                job.progress = frac
@@ -1,14 +1,29 @@
 from __future__ import annotations
 import os
 import threading
-import flet as ft
 import pandas as pd
-from fastapi import FastAPI
+from fastapi import Body, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from supabase import create_client, Client
-from benches_data import load_benches, basins_list, benches_for_basin
-from benches_ui import IntervalSelector
-from map_view import MapPanel
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from geometry import parse_polygon
+from jobs import JobScheduler
+from wells_loader import (
+    SNAPSHOT_PATH, WellSnapshot, build_in_background, build_snapshot_job, current_snapshot, job_worker_init,
+    persisted_stamp, rebuild_basin_job, release_snapshot,
+)
+from wells_sync import SYNC_INTERVAL_S, DeltaSync
+from wells_export import (
+    EXPORT_INLINE_MAX, FORMATS, MEDIA_TYPES, count_rows, export_columns, export_job, needs_lazy_groups,
+    stream_csv,
+)
+from gun_barrel import gun_barrel
+from parent_child import (
+    DEV_CLASSES, OFFSET_RADIUS_FT, adopt_classes, classify_basin_job, classify_in_background, require_classes,
+    spacing_as_of, well_parent_child,
+)
+from wells_index import (
+    neighbors_of_point, neighbors_of_well, select_rows, stream_within, within_summary,
+)
 from dotenv import load_dotenv
 import uvicorn
 
@@ -21,16 +36,56 @@ SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 MAPBOX_TOKEN = os.getenv("MAPBOX_TOKEN")
 API_URL = os.getenv("API_URL")
 
-print(f"🔍 SUPABASE_URL = {SUPABASE_URL}")
-print(f"🔍 MAPBOX_TOKEN starts with: {str(MAPBOX_TOKEN)[:8]}")
+DEFAULT_BASIN = "Delaware"
 
 # ===============================================================
 # 2. Supabase client
 # ===============================================================
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+# Created on startup rather than at import: spawned job workers re-run this
+# module and need neither the client nor the Flet UI (imported in main()).
+supabase = None
+delta_sync = DeltaSync(None)
 
 # ===============================================================
-# 3. FastAPI backend
+# 3. Background jobs (process pool, never in request handlers)
+# ===============================================================
+# Results are cached per persisted snapshot version, which is what workers
+# read; workers drop their copy after each job.
+jobs = JobScheduler(
+    cache_stamp=persisted_stamp, worker_init=job_worker_init, after_job=release_snapshot,
+)
+
+# kind -> module-level function run in a worker process
+JOB_KINDS = {
+    "snapshot": build_snapshot_job,
+    "rebuild_basin": rebuild_basin_job,
+    "export": export_job,
+    "gun_barrel": gun_barrel,
+    "summary": within_summary,
+    "parent_child": classify_basin_job,
+}
+# kind -> params a client may set. Anything else (file paths, or names the
+# scheduler itself takes such as priority) is rejected before queueing.
+JOB_PARAMS = {
+    "snapshot": set(),
+    "rebuild_basin": {"basin"},
+    "export": {"fmt", "filters", "columns"},
+    "gun_barrel": {"basin", "line", "polygon"},
+    "summary": {"polygon", "basins", "dev_class"},
+    "parent_child": {"basin", "radius_ft", "codev_days"},
+}
+
+def _swap_from_file(job):
+    # Resets the sync to the file's mark so delta rows the job never saw are re-pulled
+    delta_sync.adopt(WellSnapshot.load(SNAPSHOT_PATH))
+    print(f"🧱 Swapped in snapshot from job {job.id}")
+
+jobs.on_done("snapshot", _swap_from_file)
+jobs.on_done("rebuild_basin", _swap_from_file)
+jobs.on_done("parent_child", lambda job: adopt_classes(job.result))
+
+# ===============================================================
+# 4. FastAPI backend
 # ===============================================================
 app = FastAPI(title="Spacing Project API")
 
@@ -42,6 +97,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def start_background():
+    global supabase
+    from supabase import create_client
+
+    print(f"🔍 SUPABASE_URL = {SUPABASE_URL}")
+    print(f"🔍 MAPBOX_TOKEN starts with: {str(MAPBOX_TOKEN)[:8]}")
+    supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+    delta_sync.client = supabase
+    # The first (or a stale) build runs as a job; requests meanwhile see what is on disk
+    build_in_background(lambda: jobs.submit("snapshot", build_snapshot_job, priority=10))
+    # dev_class filters read classes from these jobs instead of classifying in handlers
+    classify_in_background(lambda basin: jobs.submit("parent_child", classify_basin_job, basin=basin, priority=5))
+    current_snapshot()
+    if SYNC_INTERVAL_S > 0:
+        delta_sync.start()
+
 @app.get("/")
 def root():
     return {"message": "Backend running — UI is on / (port 8550)"}
@@ -59,28 +131,260 @@ def get_wells(limit: int = 1000):
         print(f"❌ Supabase fetch error: {e}")
         return {"error": str(e)}
 
+@app.post("/wells/within")
+def wells_within(
+    polygon: dict = Body(...),
+    basin: str | None = None,
+    include_wells: bool = True,
+    dev_class: str | None = None,
+):
+    """
+    Wells inside a GeoJSON polygon (surface hole inside or lateral touching),
+    streamed, followed by per-bench counts, median lateral length and
+    production percentiles. With dev_class, wells are filtered by
+    parent/child class and the summary adds per-class counts.
+    """
+    try:
+        parse_polygon(polygon)
+    except (ValueError, TypeError, IndexError) as e:
+        return {"error": f"Invalid polygon: {e}"}
+    basins = basin.split(",") if basin else None
+    if dev_class:
+        # Checked up front: once streaming starts the response can't become an error
+        try:
+            require_classes(basins or current_snapshot().basins)
+        except (KeyError, ValueError) as e:
+            return {"error": str(e)}
+    return StreamingResponse(
+        stream_within(polygon, basins, include_wells, dev_class), media_type="application/json"
+    )
+
+@app.get("/wells/{api_uwi}/neighbors")
+def well_neighbors(
+    api_uwi: str,
+    k: int = 10,
+    position: str = "surface",
+    bench: str | None = None,
+    status: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    dev_class: str | None = None,
+):
+    """Nearest wells to an existing well, served from the local KD-tree."""
+    try:
+        return neighbors_of_well(
+            api_uwi, k=k, position=position, bench=bench, status=status,
+            since=since, until=until, dev_class=dev_class,
+        )
+    except KeyError:
+        return {"error": f"Unknown well {api_uwi}"}
+    except ValueError as e:
+        return {"error": str(e)}
+
+@app.get("/neighbors")
+def point_neighbors(
+    lat: float,
+    lon: float,
+    k: int = 10,
+    basin: str | None = None,
+    position: str = "surface",
+    bench: str | None = None,
+    status: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    dev_class: str | None = None,
+):
+    """Nearest wells to a proposed location."""
+    try:
+        return neighbors_of_point(
+            lat, lon, k=k, basin=basin, position=position,
+            bench=bench, status=status, since=since, until=until, dev_class=dev_class,
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+
+@app.post("/export")
+def export_wells(body: dict = Body(...)):
+    """
+    Export wells matching the map filters:
+    {"format": "csv"|"parquet"|"gpkg", "basin", "bbox", "polygon",
+     "benches", "facets", "dev_class", "columns"}.
+    Small CSV exports of core columns stream back directly; everything else
+    (including any lazy-group column) becomes a job.
+    """
+    fmt = body.get("format", "csv")
+    if fmt not in FORMATS:
+        return {"error": f"format must be one of {sorted(FORMATS)}"}
+    filters = {
+        k: body[k] for k in ("basin", "bbox", "polygon", "benches", "facets", "dev_class") if body.get(k)
+    }
+    try:
+        if fmt == "csv" and not body.get("background"):
+            snap = current_snapshot()
+            columns = export_columns(snap, body.get("columns"))
+            selection = select_rows(snap, **filters)
+            if count_rows(selection) <= EXPORT_INLINE_MAX and not needs_lazy_groups(columns):
+                return StreamingResponse(
+                    stream_csv(snap, selection, columns),
+                    media_type=MEDIA_TYPES["csv"],
+                    headers={"Content-Disposition": "attachment; filename=wells.csv"},
+                )
+        job = jobs.submit("export", export_job, fmt, filters, body.get("columns"))
+        return job.to_dict()
+    except ValueError as e:
+        return {"error": str(e)}
+
+@app.get("/export/{job_id}")
+def export_status(job_id: str):
+    status = jobs.status(job_id)
+    return status if status is not None else {"error": f"Unknown export {job_id}"}
+
+@app.get("/export/{job_id}/download")
+def export_download(job_id: str):
+    job = jobs.get(job_id)
+    if job is None or job.kind != "export" or job.status != "done" or not os.path.isfile(job.result["path"]):
+        return {"error": f"Export {job_id} is not ready"}
+    path = job.result["path"]
+    return FileResponse(path, media_type=MEDIA_TYPES[job.result["format"]], filename=os.path.basename(path))
+
+@app.post("/jobs")
+def submit_job(body: dict = Body(...)):
+    """Queue {"kind", "params": {...}, "priority"}; identical jobs are shared."""
+    kind = body.get("kind")
+    fn = JOB_KINDS.get(kind)
+    if fn is None:
+        return {"error": f"kind must be one of {sorted(JOB_KINDS)}"}
+    params = body.get("params") or {}
+    if not isinstance(params, dict):
+        return {"error": "params must be an object"}
+    unknown = sorted(set(params) - JOB_PARAMS[kind])
+    if unknown:
+        return {"error": f"{kind} jobs do not take {', '.join(unknown)}"}
+    try:
+        priority = int(body.get("priority", 0))
+    except (TypeError, ValueError):
+        return {"error": "priority must be an integer"}
+    if kind == "rebuild_basin":
+        current_snapshot().save(SNAPSHOT_PATH)  # the job starts from the file; bring it up to date
+    job = jobs.submit(kind, fn, priority=priority, **params)
+    return job.to_dict()
+
+@app.get("/jobs")
+def list_jobs(kind: str | None = None):
+    return {"jobs": jobs.list(kind)}
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str, include_result: bool = False):
+    job = jobs.get(job_id)
+    if job is None:
+        return {"error": f"Unknown job {job_id}"}
+    out = job.to_dict()
+    if include_result and job.status == "done":
+        out["result"] = job.result
+    return out
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    return {"id": job_id, "cancelled": jobs.cancel(job_id)}
+
 @app.get("/wells_bbox")
-def wells_bbox(bbox: str):
+def wells_bbox(bbox: str, basin: str | None = None, dev_class: str | None = None, limit: int = 5000):
+    """Surface locations inside a lon/lat bbox, from the local snapshot."""
+    print(f"➡️  /wells_bbox received bbox={bbox} dev_class={dev_class}")
+    snap = current_snapshot()
+    try:
+        selection = select_rows(snap, basin=basin, bbox=bbox, dev_class=dev_class)
+    except ValueError as e:
+        return {"error": str(e)}
+    out = []
+    for b, rows in selection.items():
+        part = snap.basin_frame(b).iloc[rows[:max(0, limit - len(out))]]
+        out += part[["Latitude", "Longitude"]].astype(float).to_dict(orient="records")
+        if len(out) >= limit:
+            break
+    return out
+
+@app.get("/wells/{api_uwi}/parent_child")
+def well_parent_child_view(api_uwi: str, radius_ft: float = OFFSET_RADIUS_FT):
+    """Parent / child / co-developed class of a well and its same-bench offsets."""
+    try:
+        return well_parent_child(api_uwi, radius_ft)
+    except KeyError:
+        return {"error": f"Unknown well {api_uwi}"}
+
+@app.get("/wells/{api_uwi}/spacing")
+def well_spacing_as_of(api_uwi: str, as_of: str, radius_ft: float = OFFSET_RADIUS_FT):
+    """Same-bench offsets that existed (were spudded) on the as_of date."""
+    try:
+        return spacing_as_of(api_uwi, as_of, radius_ft)
+    except KeyError:
+        return {"error": f"Unknown well {api_uwi}"}
+    except ValueError as e:
+        return {"error": str(e)}
+
+@app.get("/snapshot")
+def snapshot_info():
+    """Per-basin partition table of the local well snapshot."""
+    snap = current_snapshot()
+    return {
+        "count": snap.rows,
+        "built_at": snap.built_at,
+        "building": bool(snap.meta.get("building")),
+        "failed_basins": snap.meta.get("failed_basins") or {},
+        "partitions": snap.partitions.reset_index(drop=True).to_dict(orient="records"),
+    }
+
+@app.get("/snapshot/memory")
+def snapshot_memory(top: int = 50):
+    """Bytes per column of the in-memory well store."""
+    store = current_snapshot().store
+    report = store.memory_report()
+    return {
+        "total_bytes": store.nbytes,
+        "budget_bytes": store.budget_bytes,
+        "columns": report.head(top).to_dict(orient="records"),
+    }
+
+@app.get("/sync/status")
+def sync_status():
+    """High-water mark and staleness of the local snapshot vs the wells table."""
+    return delta_sync.status()
+
+@app.post("/gun_barrel")
+def gun_barrel_view(body: dict = Body(...)):
     """
-    Temporary endpoint to simulate spatial filtering.
-    Replace with real Supabase query later.
+    Gun-barrel section for {"basin", "line": [[lon, lat], [lon, lat]]}
+    or {"basin", "polygon": <GeoJSON>}.
     """
-    print(f"➡️  /wells_bbox received bbox={bbox}")
-    # Static fake wells for testing
-    return [
-        {"Latitude": 31.8, "Longitude": -103.4},
-        {"Latitude": 32.1, "Longitude": -103.0},
-        {"Latitude": 31.6, "Longitude": -102.7},
-        {"Latitude": 31.9, "Longitude": -103.2},
-    ]
+    try:
+        return gun_barrel(body.get("basin", DEFAULT_BASIN), line=body.get("line"), polygon=body.get("polygon"))
+    except ValueError as e:
+        return {"error": str(e)}
+
+@app.post("/gun_barrel/image")
+def gun_barrel_image(body: dict = Body(...)):
+    """Same section as /gun_barrel, rendered as a PNG (offset across, TVD down)."""
+    basin = body.get("basin", DEFAULT_BASIN)
+    try:
+        section = gun_barrel(basin, line=body.get("line"), polygon=body.get("polygon"))
+    except ValueError as e:
+        return {"error": str(e)}
+    from benches_chart import make_gun_barrel_image  # matplotlib: server only, not job workers
+
+    png = make_gun_barrel_image(section, title=f"{basin} gun barrel")
+    return Response(content=png, media_type="image/png")
 
 # ===============================================================
-# 4. Flet Web App
+# 5. Flet Web App
 # ===============================================================
 APP_NAME = "Well Spacing"
-DEFAULT_BASIN = "Delaware"
 
 def main(page: ft.Page):
+    import flet as ft
+    from benches_data import load_benches, basins_list, benches_for_basin
+    from benches_ui import IntervalSelector
+    from map_view import MapPanel
+
     page.title = APP_NAME
     page.theme_mode = ft.ThemeMode.DARK
     page.window_width = 1200
@@ -108,6 +412,13 @@ def main(page: ft.Page):
         width=250,
     )
 
+    dev_class_dd = ft.Dropdown(
+        label="Development",
+        options=[ft.dropdown.Option("all")] + [ft.dropdown.Option(c) for c in DEV_CLASSES],
+        value="all",
+        width=200,
+    )
+
     benches_btn = ft.TextButton("△ Benches")
     map_btn = ft.TextButton("🗺️ Map")
     center_panel = ft.Container(expand=True, alignment=ft.alignment.center)
@@ -120,20 +431,24 @@ def main(page: ft.Page):
 
     def show_map(e=None):
         style = map_style_dd.value or "dark"
-        map_panel = MapPanel(style)
+        dev_class = None if dev_class_dd.value in (None, "all") else dev_class_dd.value
+        map_panel = MapPanel(style, dev_class=dev_class)
         center_panel.content = map_panel
         page.update()
 
     benches_btn.on_click = show_benches
     map_btn.on_click = show_map
-    header = ft.Row([basin_dd, map_style_dd, benches_btn, map_btn], spacing=12)
+    dev_class_dd.on_change = show_map
+    header = ft.Row([basin_dd, map_style_dd, dev_class_dd, benches_btn, map_btn], spacing=12)
     page.add(header, ft.Divider(), center_panel)
     show_map()
 
 # ===============================================================
-# 5. Run both backend + UI together
+# 6. Run both backend + UI together
 # ===============================================================
 if __name__ == "__main__":
+    import flet as ft
+
     threading.Thread(
         target=lambda: uvicorn.run(app, host="0.0.0.0", port=8000),
         daemon=True,
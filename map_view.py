@@ -5,6 +5,7 @@ import flet as ft
 from flet.plotly_chart import PlotlyChart
 import plotly.express as px
 import plotly.io as pio
+from projection import fit_zoom
 
 # ===============================================================
 # Enable interactive JS rendering (iframe mode)
@@ -26,7 +27,7 @@ def get_plotly_chart(fig):
 class MapPanel(ft.Container):
     """Interactive Mapbox panel for visualizing wells dynamically."""
 
-    def __init__(self, map_style="dark"):
+    def __init__(self, map_style="dark", dev_class=None):
         super().__init__(
             expand=False,
             width=900,
@@ -38,6 +39,7 @@ class MapPanel(ft.Container):
         )
 
         self.map_style = map_style
+        self.dev_class = dev_class  # parent / child / co-developed filter
         self._current_bbox = [-106, 31, -101, 35]  # Default Delaware region
         self._chart_container = ft.Container(expand=True)
         self._pending_draw = True
@@ -73,6 +75,8 @@ class MapPanel(ft.Container):
         bbox_str = ",".join(map(str, bbox))
         api_url = "http://127.0.0.1:8000"  # ✅ local container API
         url = f"{api_url}/wells_bbox?bbox={bbox_str}"
+        if self.dev_class:
+            url += f"&dev_class={self.dev_class}"
 
         print(f"📡 Fetching wells for bbox {bbox_str} from {url}")
         try:
@@ -134,8 +138,8 @@ class MapPanel(ft.Container):
             lat_center = (max(lats) + min(lats)) / 2
             lon_center = (max(lons) + min(lons)) / 2
             fig.update_layout(mapbox_center={"lat": lat_center, "lon": lon_center})
-            bbox_span = max(max(lats) - min(lats), max(lons) - min(lons))
-            zoom = max(5, 8 - bbox_span * 10)
+            # Fit on projected metres, not degrees, so zoom is right at any latitude
+            zoom = fit_zoom(lats, lons, width_px=self.width - 16, height_px=520)
             fig.update_layout(mapbox_zoom=zoom)
 
         self._chart_container.content = get_plotly_chart(fig)
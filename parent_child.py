@@ -0,0 +1,336 @@
+# parent_child.py
+from __future__ import annotations
+import os
+import threading
+from functools import lru_cache
+from typing import Callable
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from well_store import KEY_COLUMN, NO_DATE, to_day_numbers
+from wells_index import basin_index
+from wells_loader import SNAPSHOT_PATH, current_snapshot
+
+OFFSET_RADIUS_FT = float(os.getenv("PARENT_CHILD_RADIUS_FT", "1320"))
+CODEV_WINDOW_DAYS = int(os.getenv("PARENT_CHILD_CODEV_DAYS", "90"))
+DEV_CLASSES = ("parent", "child", "co-developed")
+DATE_COLUMNS = ("SpudDate", "CompletionDate", "FirstProdDate")
+# Per-row classes written by classify_basin_job, loaded by the server
+CLASSES_DIR = os.getenv("PARENT_CHILD_DIR", os.path.join(os.path.dirname(SNAPSHOT_PATH), "classes"))
+
+
+def _days(part: pd.DataFrame, col: str) -> np.ndarray:
+    if col in part:
+        return part[col].to_numpy().astype(np.int64)
+    return np.full(len(part), NO_DATE, dtype=np.int64)
+
+
+def _coalesce(*cols: np.ndarray) -> np.ndarray:
+    out = cols[0].copy()
+    for c in cols[1:]:
+        missing = out == NO_DATE
+        out[missing] = c[missing]
+    return out
+
+
+# ===============================================================
+# Temporal index
+# ===============================================================
+class TemporalIndex:
+    """
+    Per-basin existence / completion / online day numbers, with one sort
+    order over existence so "which wells existed on date D" is a binary search.
+    """
+
+    def __init__(self, part: pd.DataFrame):
+        spud, comp, first = (_days(part, c) for c in DATE_COLUMNS)
+        # A well exists from spud, is completed when frac'd and online from
+        # first production; a missing date falls back to the nearest known one
+        self.exists = _coalesce(spud, comp, first)
+        self.completed = _coalesce(comp, first, spud)
+        self.online = _coalesce(first, comp, spud)
+        known = np.flatnonzero(self.exists != NO_DATE)
+        order = known[np.argsort(self.exists[known], kind="stable")]
+        self.sorted = self.exists[order]
+        self.rank = np.full(len(part), np.iinfo(np.int64).max, dtype=np.int64)
+        self.rank[order] = np.arange(len(order))
+
+    def existing_count(self, as_of: int) -> int:
+        return int(np.searchsorted(self.sorted, as_of, side="right"))
+
+    def existed(self, rows: np.ndarray, as_of: int) -> np.ndarray:
+        """Mask over rows: True where the well existed on or before as_of."""
+        return self.rank[rows] < self.existing_count(as_of)
+
+
+# ===============================================================
+# Bulk classification
+# ===============================================================
+def _same_bench_pairs(part: pd.DataFrame, bench: np.ndarray, radius_ft: float) -> np.ndarray:
+    """(i, j) basin-row pairs in the same bench with midpoints within radius."""
+    xy = np.column_stack([part["mid_x"].to_numpy(dtype=np.float64), part["mid_y"].to_numpy(dtype=np.float64)])
+    ok = np.isfinite(xy).all(axis=1) & (bench >= 0)  # no interval: no bench to share
+    groups = pd.Series(np.flatnonzero(ok)).groupby(bench[ok])
+    pairs = []
+    for _, rows in groups:
+        rows = rows.to_numpy()
+        if len(rows) < 2:
+            continue
+        p = cKDTree(xy[rows]).query_pairs(radius_ft, output_type="ndarray")
+        if len(p):
+            pairs.append(rows[p])
+    return np.vstack(pairs) if pairs else np.zeros((0, 2), dtype=np.int64)
+
+
+def classify_basin(
+    basin: str, radius_ft: float = OFFSET_RADIUS_FT, codev_days: int = CODEV_WINDOW_DAYS
+) -> pd.DataFrame:
+    """
+    Classify every well in a basin against its same-bench offsets:
+      child         an offset was already online before this well was completed
+      co-developed  no earlier offset, but one completed within codev_days
+      parent        no earlier or concurrent offset (includes stand-alone wells)
+    Wells without a completion date or a landing interval stay unclassified.
+    """
+    part = current_snapshot().basin_frame(basin)
+    tindex = temporal_index(basin)
+    bench = basin_index(basin).bench_codes
+    online, completed = tindex.online, tindex.completed
+    n = len(part)
+
+    pairs = _same_bench_pairs(part, bench, radius_ft)
+    a, b = pairs[:, 0], pairs[:, 1]
+    known = (completed[a] != NO_DATE) & (completed[b] != NO_DATE)
+    a, b = a[known], b[known]
+    both_online = (online[a] != NO_DATE) & (online[b] != NO_DATE)
+
+    # Directed "x was online before y completed", with the co-dev window as slack
+    a_first = both_online & (online[a] + codev_days < completed[b])
+    b_first = both_online & (online[b] + codev_days < completed[a])
+    codev = ~a_first & ~b_first & (np.abs(completed[a] - completed[b]) <= codev_days)
+
+    parents_of = np.zeros(n, dtype=np.int32)   # earlier offsets
+    children_of = np.zeros(n, dtype=np.int32)  # later offsets
+    codev_of = np.zeros(n, dtype=np.int32)
+    offsets = np.zeros(n, dtype=np.int32)
+    np.add.at(parents_of, b[a_first], 1)
+    np.add.at(children_of, a[a_first], 1)
+    np.add.at(parents_of, a[b_first], 1)
+    np.add.at(children_of, b[b_first], 1)
+    np.add.at(codev_of, a[codev], 1)
+    np.add.at(codev_of, b[codev], 1)
+    np.add.at(offsets, pairs[:, 0], 1)
+    np.add.at(offsets, pairs[:, 1], 1)
+
+    dev = np.where(parents_of > 0, "child", np.where(codev_of > 0, "co-developed", "parent"))
+    dev = np.where((completed == NO_DATE) | (bench < 0), None, dev)
+    return pd.DataFrame({
+        "api_uwi": part[KEY_COLUMN].astype(str).to_numpy(),
+        "dev_class": pd.Categorical(dev, categories=list(DEV_CLASSES)),
+        "offsets": offsets,
+        "earlier_offsets": parents_of,
+        "later_offsets": children_of,
+        "codev_offsets": codev_of,
+    })
+
+
+@lru_cache(maxsize=64)
+def _cached_temporal(basin: str, basin_stamp: float) -> TemporalIndex:
+    return TemporalIndex(current_snapshot().basin_frame(basin))
+
+
+def temporal_index(basin: str) -> TemporalIndex:
+    return _cached_temporal(basin, current_snapshot().basin_stamp(basin))
+
+
+def _classes_path(basin: str, radius_ft: float, codev_days: int) -> str:
+    return os.path.join(CLASSES_DIR, f"{basin}__{radius_ft:g}ft__{codev_days}d.pkl")
+
+
+def classify_basin_job(basin: str, radius_ft: float = OFFSET_RADIUS_FT, codev_days: int = CODEV_WINDOW_DAYS) -> dict:
+    """
+    Scheduler job: classify a basin and persist the per-row classes for the
+    server to load (adopt_classes); returns class counts.
+    """
+    stamp = current_snapshot().basin_stamp(basin)
+    classes = classify_basin(basin, radius_ft, codev_days)
+    path = _classes_path(basin, radius_ft, codev_days)
+    os.makedirs(CLASSES_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    pd.to_pickle({"stamp": stamp, "classes": classes}, tmp)
+    os.replace(tmp, path)
+    counts = classes["dev_class"].value_counts(dropna=False)
+    return {
+        "basin": basin,
+        "wells": len(classes),
+        "radius_ft": radius_ft,
+        "codev_days": codev_days,
+        "counts": {str(k) if pd.notna(k) else "unknown": int(v) for k, v in counts.items()},
+    }
+
+
+# ---------- Cached classes (the server never classifies inline) ----------
+_classes_lock = threading.Lock()
+_latest: dict[str, dict] = {}  # basin -> {"stamp", "classes"} from the newest default-parameter run
+_aligned: dict[str, tuple] = {}  # basin -> (live stamp, latest entry, classes aligned to live rows)
+_requested: dict[str, float] = {}  # basin -> live stamp a job was last queued for
+_submit_classify: Callable[[str], object] | None = None
+
+
+def classify_in_background(submit: Callable[[str], object]):
+    """Have basin_classes() queue classify_basin_job via submit(basin) instead of classifying inline."""
+    global _submit_classify
+    _submit_classify = submit
+
+
+def adopt_classes(result: dict):
+    """on_done callback for classify_basin_job: load its per-row classes into the cache."""
+    if (result["radius_ft"], result["codev_days"]) != (OFFSET_RADIUS_FT, CODEV_WINDOW_DAYS):
+        return  # filters use the default parameters only
+    latest = pd.read_pickle(_classes_path(result["basin"], OFFSET_RADIUS_FT, CODEV_WINDOW_DAYS))
+    with _classes_lock:
+        _latest[result["basin"]] = latest
+
+
+def _align(classes: pd.DataFrame, part: pd.DataFrame) -> pd.DataFrame:
+    """Classes reindexed to the basin's current rows; wells added since are unclassified."""
+    keys = part[KEY_COLUMN].astype(str).to_numpy()
+    if len(classes) == len(keys) and (classes["api_uwi"].to_numpy() == keys).all():
+        return classes
+    index = pd.Index(classes["api_uwi"])
+    first = ~index.duplicated()
+    pos = pd.Series(np.flatnonzero(first), index=index[first]).reindex(keys).fillna(-1).to_numpy(dtype=np.int64)
+    out = classes.iloc[np.maximum(pos, 0)].reset_index(drop=True)
+    out["api_uwi"] = keys
+    missing = pos < 0
+    out.loc[missing, "dev_class"] = None
+    for c in ("offsets", "earlier_offsets", "later_offsets", "codev_offsets"):
+        out.loc[missing, c] = 0
+    return out
+
+
+def basin_classes(basin: str) -> pd.DataFrame | None:
+    """
+    Default-parameter classes aligned with the basin's current rows, or None
+    if the basin has not been classified yet. With a background submitter
+    registered (the server), a missing or outdated result queues a job and
+    the last result keeps being served; elsewhere (job workers, scripts) the
+    basin is classified here.
+    """
+    snap = current_snapshot()
+    stamp = snap.basin_stamp(basin)
+    with _classes_lock:
+        latest = _latest.get(basin)
+        if latest is None or latest["stamp"] != stamp:
+            if _submit_classify is None:
+                latest = _latest[basin] = {"stamp": stamp, "classes": classify_basin(basin)}
+            elif _requested.get(basin) != stamp:
+                _requested[basin] = stamp
+                _submit_classify(basin)
+        if latest is None:
+            return None
+        cached = _aligned.get(basin)
+        if cached is None or cached[0] != stamp or cached[1] is not latest:
+            cached = _aligned[basin] = (stamp, latest, _align(latest["classes"], snap.basin_frame(basin)))
+        return cached[2]
+
+
+def require_classes(basins: list[str]):
+    """Raise ValueError naming any basin whose classes are still being computed (and queue them)."""
+    pending = [b for b in basins if basin_classes(b) is None]
+    if pending:
+        raise ValueError(f"Development classes are still being computed for {', '.join(pending)}; retry shortly")
+
+
+# ===============================================================
+# Per-well queries
+# ===============================================================
+def _locate(api_uwi: str):
+    snap = current_snapshot()
+    row = snap.locate(api_uwi)
+    if row is None:
+        raise KeyError(api_uwi)
+    basin = str(snap.frame["basin"].iloc[row])
+    return snap, basin, row - snap.basin_slice(basin).start
+
+
+def _offsets(part: pd.DataFrame, local: int, radius_ft: float) -> np.ndarray:
+    """Same-bench offsets of one well within radius (lateral midpoints)."""
+    index = basin_index(str(part["basin"].iloc[local]))
+    bench = index.bench_codes
+    x, y = float(part["mid_x"].iloc[local]), float(part["mid_y"].iloc[local])
+    if bench[local] < 0 or not (np.isfinite(x) and np.isfinite(y)):
+        return np.zeros(0, dtype=np.int64)  # no interval (or location): no offsets to compare
+    hits = index.ids["lateral"][index.trees["lateral"].query_ball_point([x, y], radius_ft)]
+    hits = hits[hits != local]
+    return hits[bench[hits] == bench[local]]
+
+
+def _offset_records(part, local, rows, tindex) -> list[dict]:
+    dx = part["mid_x"].to_numpy(dtype=np.float64)[rows] - float(part["mid_x"].iloc[local])
+    dy = part["mid_y"].to_numpy(dtype=np.float64)[rows] - float(part["mid_y"].iloc[local])
+    out = pd.DataFrame({
+        "api_uwi": part[KEY_COLUMN].iloc[rows].astype(str).to_numpy(),
+        "well_name": part["WellName"].iloc[rows].astype(str).to_numpy() if "WellName" in part else None,
+        "distance_ft": np.round(np.hypot(dx, dy), 1),
+        "completed_day": tindex.completed[rows],
+        "online_day": tindex.online[rows],
+    }).sort_values("distance_ft")
+    for c in ("completed_day", "online_day"):
+        days = out.pop(c).to_numpy()
+        out[c.replace("_day", "")] = [
+            None if d == NO_DATE else str(np.datetime64("1970-01-01") + np.timedelta64(int(d), "D"))
+            for d in days
+        ]
+    return out.to_dict(orient="records")
+
+
+def well_parent_child(api_uwi: str, radius_ft: float = OFFSET_RADIUS_FT) -> dict:
+    """A well's class plus its earlier / co-developed / later offsets."""
+    snap, basin, local = _locate(api_uwi)
+    part = snap.basin_frame(basin)
+    tindex = temporal_index(basin)
+    rows = _offsets(part, local, radius_ft)
+    comp = tindex.completed[local]
+    online = tindex.online[rows]
+    completed = tindex.completed[rows]
+    ok = (completed != NO_DATE) & (comp != NO_DATE)
+    earlier = ok & (online != NO_DATE) & (online + CODEV_WINDOW_DAYS < comp)
+    later = ok & (tindex.online[local] != NO_DATE) & (tindex.online[local] + CODEV_WINDOW_DAYS < completed)
+    codev = ok & ~earlier & ~later & (np.abs(completed - comp) <= CODEV_WINDOW_DAYS)
+    # The cached basin run when ready; otherwise this well's offsets decide
+    classes = basin_classes(basin) if radius_ft == OFFSET_RADIUS_FT else None
+    unknown = comp == NO_DATE or basin_index(basin).bench_codes[local] < 0
+    dev = classes["dev_class"].iloc[local] if classes is not None else (
+        None if unknown else "child" if earlier.any() else "co-developed" if codev.any() else "parent"
+    )
+    return {
+        "api_uwi": api_uwi,
+        "basin": basin,
+        "dev_class": None if pd.isna(dev) else str(dev),
+        "radius_ft": radius_ft,
+        "parents": _offset_records(part, local, rows[earlier], tindex),
+        "co_developed": _offset_records(part, local, rows[codev], tindex),
+        "children": _offset_records(part, local, rows[later], tindex),
+    }
+
+
+def spacing_as_of(api_uwi: str, as_of: str, radius_ft: float = OFFSET_RADIUS_FT) -> dict:
+    """Same-bench offsets that existed by as_of (spudded, or else completed / online), nearest first."""
+    snap, basin, local = _locate(api_uwi)
+    day = int(to_day_numbers(pd.Series([as_of]))[0])
+    if day == NO_DATE:
+        raise ValueError(f"Invalid as_of date {as_of!r}")
+    part = snap.basin_frame(basin)
+    tindex = temporal_index(basin)
+    rows = _offsets(part, local, radius_ft)
+    rows = rows[tindex.existed(rows, day)]
+    records = _offset_records(part, local, rows, tindex)
+    return {
+        "api_uwi": api_uwi,
+        "basin": basin,
+        "as_of": as_of,
+        "radius_ft": radius_ft,
+        "nearest_offset_ft": records[0]["distance_ft"] if records else None,
+        "offsets": records,
+    }
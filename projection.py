@@ -0,0 +1,79 @@
+# projection.py
+from __future__ import annotations
+import math
+import os
+from functools import lru_cache
+import numpy as np
+from pyproj import CRS, Transformer
+
+# Shipped .prj files are GCS_WGS_1984; used when a basin has none.
+DEFAULT_SOURCE_WKT = CRS.from_epsg(4326).to_wkt()
+
+# Mapbox GL (used by plotly scatter_mapbox) renders 512 px tiles
+MAPBOX_M_PER_PX_Z0 = 78271.517
+MIN_ZOOM, MAX_ZOOM = 3.0, 15.0
+
+
+def read_prj(shp_path: str | None) -> str:
+    """WKT from the .prj next to a shapefile, or the WGS84 default."""
+    if shp_path:
+        prj = os.path.splitext(shp_path)[0] + ".prj"
+        try:
+            with open(prj, "r", encoding="utf-8") as f:
+                wkt = f.read().strip()
+            if wkt:
+                CRS.from_wkt(wkt)  # reject anything pyproj cannot parse
+                return wkt
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable projection {prj}: {e}")
+    return DEFAULT_SOURCE_WKT
+
+
+def local_crs(origin_lat: float, origin_lon: float) -> str:
+    """
+    Azimuthal equidistant CRS in feet centred on the basin: distances and
+    bearings from the centre are exact and stay within ~0.1% across a basin.
+    """
+    return (
+        f"+proj=aeqd +lat_0={origin_lat:.6f} +lon_0={origin_lon:.6f} "
+        "+x_0=0 +y_0=0 +datum=WGS84 +units=ft +no_defs"
+    )
+
+
+@lru_cache(maxsize=64)
+def transformer(source_wkt: str, target: str) -> Transformer:
+    """Transformers are expensive to build; keep one per (source, target)."""
+    return Transformer.from_crs(CRS.from_wkt(source_wkt), CRS.from_user_input(target), always_xy=True)
+
+
+def to_local(lon, lat, source_wkt: str, target: str):
+    """Batch-transform lon/lat arrays into local x/y feet (float32)."""
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    x, y = transformer(source_wkt, target).transform(lon, lat)
+    return np.asarray(x, dtype=np.float32), np.asarray(y, dtype=np.float32)
+
+
+# ===============================================================
+# Map helpers
+# ===============================================================
+def projected_extent_m(lats, lons) -> tuple[float, float]:
+    """East-west and north-south extent in metres of a set of points."""
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    lat0 = float((lats.max() + lats.min()) / 2)
+    lon0 = float((lons.max() + lons.min()) / 2)
+    target = local_crs(lat0, lon0).replace("+units=ft", "+units=m")
+    x, y = transformer(DEFAULT_SOURCE_WKT, target).transform(lons, lats)
+    return float(np.ptp(x)), float(np.ptp(y))
+
+
+def fit_zoom(lats, lons, width_px: int, height_px: int, padding: float = 1.2) -> float:
+    """Mapbox zoom that fits the points in a width x height viewport."""
+    if len(lats) == 0:
+        return MIN_ZOOM
+    span_x, span_y = projected_extent_m(lats, lons)
+    lat0 = math.radians((max(lats) + min(lats)) / 2)
+    m_per_px = max(span_x / width_px, span_y / height_px, 1.0) * padding
+    zoom = math.log2(MAPBOX_M_PER_PX_Z0 * math.cos(lat0) / m_per_px)
+    return max(MIN_ZOOM, min(MAX_ZOOM, zoom))
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# Modules live flat in the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,36 @@
+# tests/snapshots.py
+"""Small synthetic basins for tests that need a WellSnapshot."""
+import itertools
+import pandas as pd
+from projection import DEFAULT_SOURCE_WKT, local_crs
+from well_store import compact_frame
+from wells_loader import WellSnapshot, project_frame, swap_snapshot
+
+# Indexes are cached per (basin, built_at); every test basin gets its own stamp
+_stamps = itertools.count(1)
+
+
+def make_basin(name, keys, lat0=31.0, **columns):
+    raw = pd.DataFrame({
+        "API_UWI": keys,
+        "Latitude": [str(lat0 + i * 1e-3) for i in range(len(keys))],
+        "Longitude": ["-103.0"] * len(keys),
+        **columns,
+    })
+    frame = compact_frame(raw)
+    frame["basin"] = pd.Categorical([name] * len(frame))
+    crs = local_crs(lat0, -103.0)
+    frame = project_frame(frame, DEFAULT_SOURCE_WKT, crs)
+    info = {
+        "basin": name, "rows": len(frame), "origin_lat": lat0, "origin_lon": -103.0,
+        "source_crs": DEFAULT_SOURCE_WKT, "crs": crs, "source": f"{name}.csv",
+        "built_at": float(next(_stamps)), "build_s": 0.0,
+    }
+    return frame, info
+
+
+def install(*basins, meta=None) -> WellSnapshot:
+    """Make these basins the process-wide current snapshot."""
+    snap = WellSnapshot.from_parts(list(basins), meta)
+    swap_snapshot(snap)
+    return snap
@@ -0,0 +1,61 @@
+# tests/test_geometry.py
+import numpy as np
+import pytest
+from geometry import parse_polygon, points_in_rings, segments_cross_line, segments_cross_rings
+
+SQUARE = np.array([[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]], dtype=float)
+HOLE = np.array([[4, 4], [6, 4], [6, 6], [4, 6], [4, 4]], dtype=float)
+
+
+def test_points_in_square_with_hole():
+    x = np.array([1.0, 5.0, 11.0, 9.9, -0.1])
+    y = np.array([1.0, 5.0, 5.0, 9.9, 5.0])
+    assert points_in_rings(x, y, [SQUARE, HOLE]).tolist() == [True, False, False, True, False]
+
+
+def test_points_in_rings_spans_blocks(monkeypatch):
+    import geometry
+
+    monkeypatch.setattr(geometry, "BLOCK_CELLS", 12)  # 5 edges -> 2-row blocks
+    x = np.linspace(-5, 15, 11)
+    inside = points_in_rings(x, np.full_like(x, 2.0), [SQUARE])
+    assert inside.tolist() == [(0 < v < 10) for v in x]
+
+
+def test_segments_cross_rings():
+    # crosses the right edge / fully inside / fully outside
+    ax, ay = np.array([5.0, 2.0, 20.0]), np.array([5.0, 2.0, 20.0])
+    bx, by = np.array([15.0, 8.0, 30.0]), np.array([5.0, 8.0, 20.0])
+    assert segments_cross_rings(ax, ay, bx, by, [SQUARE]).tolist() == [True, False, False]
+
+
+def test_segments_cross_line_fraction():
+    # vertical segments at x=2 and x=8 against the horizontal line y=5 from x=0 to x=10
+    mask, s = segments_cross_line([2, 8, 20], [0, 0, 0], [2, 8, 20], [10, 10, 10], (0, 5), (10, 5))
+    assert mask.tolist() == [True, True, False]
+    assert s[:2] == pytest.approx([0.2, 0.8])
+
+
+def test_parse_polygon_shapes():
+    feature = {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [SQUARE.tolist()]}}
+    assert len(parse_polygon(feature)) == 1
+    multi = {"type": "MultiPolygon", "coordinates": [[SQUARE.tolist()], [(SQUARE + 20).tolist()]]}
+    assert len(parse_polygon(multi)) == 2
+    with pytest.raises(ValueError):
+        parse_polygon({"type": "Point", "coordinates": [0, 0]})
+
+
+def test_pruned_blocks_match_single_block(monkeypatch):
+    import geometry
+
+    rng = np.random.default_rng(0)
+    theta = np.linspace(0, 2 * np.pi, 400)
+    radius = 5 + rng.uniform(-1, 1, len(theta))
+    star = np.column_stack([radius * np.cos(theta), radius * np.sin(theta)])
+    star[-1] = star[0]
+    ax, ay = rng.uniform(-8, 8, 500), rng.uniform(-8, 8, 500)
+    bx, by = ax + rng.uniform(-3, 3, 500), ay + rng.uniform(-3, 3, 500)
+    whole = points_in_rings(ax, ay, [star]), segments_cross_rings(ax, ay, bx, by, [star])
+    monkeypatch.setattr(geometry, "BLOCK_CELLS", 400 * 7)
+    assert (points_in_rings(ax, ay, [star]) == whole[0]).all()
+    assert (segments_cross_rings(ax, ay, bx, by, [star]) == whole[1]).all()
@@ -0,0 +1,61 @@
+# tests/test_gun_barrel.py
+import numpy as np
+import pandas as pd
+import pytest
+from geometry import segments_cross_line
+from gun_barrel import _normal_offsets, assign_benches
+
+BANDS = pd.DataFrame({
+    "bench": ["Wolfcamp A", "Wolfcamp B"],
+    "group": ["Wolfcamp", "Wolfcamp"],
+    "display_order": [1, 2],
+    "top_ft": [9000.0, 9400.0],
+    "base_ft": [9300.0, 9700.0],
+})
+
+
+def test_assign_benches_by_name_then_depth():
+    interval = pd.Series(["WOLFCAMP_A", None, "Unknown", None])
+    tvd = np.array([9600.0, 9100.0, 9500.0, 12000.0])
+    # reported interval wins over depth; unmatched names fall back to the TVD band
+    assert assign_benches(interval, tvd, BANDS).tolist() == ["Wolfcamp A", "Wolfcamp A", "Wolfcamp B", None]
+
+
+def test_assign_benches_without_bands():
+    assert assign_benches(pd.Series(["Wolfcamp A"]), np.array([9100.0]), BANDS.iloc[:0]).tolist() == [None]
+
+
+@pytest.mark.parametrize("angle_deg", [90, 60, 30])
+def test_line_offsets_are_perpendicular_spacing(angle_deg):
+    # East-west laterals 660 ft apart, cut by a section line at angle_deg to them
+    ys = np.array([0.0, 660.0, 1320.0])
+    part = pd.DataFrame({
+        "heel_x": np.full(3, -5000.0), "heel_y": ys,
+        "toe_x": np.full(3, 5000.0), "toe_y": ys,
+    })
+    t = np.radians(angle_deg)
+    p, q = (-3000 * np.cos(t), -3000 * np.sin(t)), (5000 * np.cos(t), 5000 * np.sin(t))
+    mask, s = segments_cross_line(part["heel_x"], part["heel_y"], part["toe_x"], part["toe_y"], p, q)
+    rows = np.flatnonzero(mask)
+    cx, cy = p[0] + s[rows] * (q[0] - p[0]), p[1] + s[rows] * (q[1] - p[1])
+    assert np.sort(_normal_offsets(part, rows, cx, cy)) == pytest.approx([0.0, 660.0, 1320.0])
+
+
+def test_polygon_section_keeps_laterals_with_midpoint_outside():
+    from gun_barrel import gun_barrel
+    from snapshots import install, make_basin
+
+    lats = ["31.000", "31.002", "31.004"]
+    install(make_basin(
+        "GB", ["w1", "w2", "w3"],
+        Latitude_BH=lats, Longitude_BH=["-102.95"] * 3,
+    ))
+    # Laterals run -103.0 -> -102.95; the box covers part of the heel half only,
+    # so surface holes and midpoints (lon -102.975) lie outside it
+    box = {"type": "Polygon", "coordinates": [[
+        [-102.99, 30.99], [-102.98, 30.99], [-102.98, 31.01], [-102.99, 31.01], [-102.99, 30.99],
+    ]]}
+    section = gun_barrel("GB", polygon=box)
+    assert [w["api_uwi"] for w in section["wells"]] == ["w1", "w2", "w3"]
+    section["wells"].clear()  # callers get a copy; the cache is untouched
+    assert gun_barrel("GB", polygon=box)["count"] == 3
@@ -0,0 +1,56 @@
+# tests/test_jobs.py
+import time
+import pytest
+from jobs import JobScheduler
+
+
+def echo(x):
+    return x
+
+
+def nap(s):
+    time.sleep(s)
+    return s
+
+
+def wait(*jobs, timeout=30.0):
+    end = time.time() + timeout
+    while any(j.status in ("queued", "running") for j in jobs):
+        assert time.time() < end, "jobs did not finish"
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def scheduler():
+    s = JobScheduler(max_workers=1)
+    yield s
+    s.shutdown()
+
+
+def test_identical_jobs_are_shared_then_cached(scheduler):
+    a = scheduler.submit("t", echo, 1)
+    b = scheduler.submit("t", echo, 1)
+    assert a is b
+    wait(a)
+    c = scheduler.submit("t", echo, 1)
+    assert c is not a and c.cached and c.result == 1
+    assert scheduler.submit("t", echo, 2) is not a
+
+
+def test_higher_priority_runs_first(scheduler):
+    blocker = scheduler.submit("t", nap, 0.5)
+    low = scheduler.submit("t", echo, "low")
+    high = scheduler.submit("t", echo, "high", priority=5)
+    wait(blocker, low, high)
+    assert high.finished_at <= low.finished_at
+
+
+def test_cancelled_job_never_runs_and_frees_its_key(scheduler):
+    blocker = scheduler.submit("t", nap, 0.5)
+    queued = scheduler.submit("t", echo, 3)
+    assert scheduler.cancel(queued.id) and queued.status == "cancelled"
+    again = scheduler.submit("t", echo, 3)
+    assert again is not queued
+    wait(blocker, again)
+    assert queued.status == "cancelled" and queued.result is None and again.result == 3
+    assert not scheduler.cancel(again.id)  # finished jobs cannot be cancelled
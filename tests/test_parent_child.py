@@ -0,0 +1,64 @@
+# tests/test_parent_child.py
+import numpy as np
+import pandas as pd
+import pytest
+import parent_child
+from parent_child import (
+    adopt_classes, basin_classes, classify_basin, classify_basin_job, classify_in_background, spacing_as_of,
+)
+from snapshots import install, make_basin
+from wells_index import filter_mask
+from wells_loader import current_snapshot, swap_snapshot
+
+KEYS = ["w1", "w2", "w3", "w4", "w5", "w6", "w7"]
+# Laterals run east, 1e-3 deg (~364 ft) apart; radius is 1320 ft
+COLUMNS = dict(
+    Latitude_BH=[str(31.0 + i * 1e-3) for i in range(7)],
+    Longitude_BH=["-102.99"] * 7,
+    ENVInterval=["WFMP A", "WFMP A", "WFMP A", "WFMP B", "WFMP B", None, "WFMP A"],
+    SpudDate=["2018-01-01", "2019-10-01", None, "2019-01-01", "2019-01-01", "2019-01-01", None],
+    CompletionDate=["2018-03-01", "2020-01-01", "2020-02-01", "2019-05-01", "2019-05-11", "2019-05-01", None],
+    FirstProdDate=["2018-04-01", "2020-02-01", "2020-03-01", "2019-06-01", "2019-06-11", "2019-06-01", None],
+)
+
+
+@pytest.fixture
+def basin(monkeypatch, tmp_path):
+    monkeypatch.setattr(parent_child, "CLASSES_DIR", str(tmp_path))
+    for name in ("_latest", "_aligned", "_requested"):
+        monkeypatch.setattr(parent_child, name, {})
+    monkeypatch.setattr(parent_child, "_submit_classify", None)
+    install(make_basin("PC", KEYS, **COLUMNS))
+    return "PC"
+
+
+def test_classify_basin(basin):
+    dev = classify_basin(basin)["dev_class"].astype(object).where(lambda s: s.notna(), None)
+    # no interval (w6) or no completion (w7): unclassified
+    assert dev.tolist() == ["parent", "child", "child", "co-developed", "co-developed", None, None]
+
+
+def test_spacing_as_of_uses_existence_date(basin):
+    # w3 was never spudded on record but was completed 2020-02-01
+    assert [o["api_uwi"] for o in spacing_as_of("w2", "2020-03-01")["offsets"]] == ["w1", "w3"]
+    assert [o["api_uwi"] for o in spacing_as_of("w2", "2019-01-01")["offsets"]] == ["w1"]
+
+
+def test_filters_serve_cached_job_classes(basin):
+    queued = []
+    classify_in_background(queued.append)
+    part = current_snapshot().basin_frame(basin)
+    with pytest.raises(ValueError, match="still being computed"):
+        filter_mask(part, dev_class="child")
+    assert basin_classes(basin) is None and queued == [basin]  # queued once per basin version
+
+    # The job runs in a worker; the server loads what it persisted
+    adopt_classes(classify_basin_job(basin))
+    assert np.flatnonzero(filter_mask(part, dev_class="child")).tolist() == [1, 2]
+
+    # A delta-synced well: the last result keeps serving (new well unclassified) while a refresh is queued
+    raw = pd.DataFrame({"API_UWI": ["w8"], "Latitude": ["31.1"], "Longitude": ["-103.0"]}, dtype=object)
+    swap_snapshot(current_snapshot().upsert(basin, raw))
+    classes = basin_classes(basin)
+    assert classes["api_uwi"].tolist() == KEYS + ["w8"] and pd.isna(classes["dev_class"].iloc[-1])
+    assert queued == [basin, basin]
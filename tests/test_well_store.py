@@ -0,0 +1,52 @@
+# tests/test_well_store.py
+import numpy as np
+import pandas as pd
+import well_store
+from well_store import (
+    NO_DATE, assign_rows, compact_frame, concat_compact, harmonize_frames, read_compact_csv,
+    to_day_numbers,
+)
+
+
+def test_day_numbers_accept_mixed_formats():
+    days = to_day_numbers(pd.Series(["2018-04-12", "2018-07-11 00:00:00", None, "garbage"]))
+    assert days.tolist() == [17633, 17723, NO_DATE, NO_DATE]
+
+
+def test_id_columns_stay_exact():
+    f = compact_frame(pd.DataFrame({
+        "API_UWI": ["a", "b"], "Unformatted_API_UWI": ["42389312340000", "42389312340001"],
+    }))
+    assert f["Unformatted_API_UWI"].tolist() == ["42389312340000", "42389312340001"]
+
+
+def test_kinds_come_from_the_whole_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(well_store, "CSV_CHUNK_ROWS", 2)
+    path = tmp_path / "w.csv"
+    path.write_text("API_UWI,Mixed,Depth\nA,1,100\nB,2,200\nC,abc,300\n")
+    f = read_compact_csv(str(path))
+    assert f["Mixed"].tolist() == ["1", "2", "abc"]  # text in a later chunk keeps the column text
+    assert f["Depth"].dtype == np.float32
+
+
+def test_harmonize_resolves_kind_conflicts():
+    a = compact_frame(pd.DataFrame({"API_UWI": ["1", "2"], "Op": ["X", "Y"], "TVD": [None, None], "Num": ["1", "2"]}))
+    b = compact_frame(pd.DataFrame({"API_UWI": ["3"], "TVD": ["100"], "Num": ["abc"]}))
+    merged = concat_compact(harmonize_frames([a, b]))
+    assert merged["TVD"].dtype == np.float32  # the all-null categorical side gives way
+    assert merged["TVD"].iloc[2] == 100
+    assert merged["Num"].tolist() == ["1.0", "2.0", "abc"]  # real text on both sides: strings
+    assert merged["Op"].isna().tolist() == [False, False, True]  # missing column filled
+
+
+def test_assign_rows_shares_unchanged_columns():
+    col = pd.Series(np.arange(4, dtype=np.float32))
+    assert assign_rows(col, np.array([1]), pd.Series([1.0], dtype=np.float32)) is col
+    out = assign_rows(col, np.array([1]), pd.Series([9.0], dtype=np.float32))
+    assert out.tolist() == [0, 9, 2, 3] and col.tolist() == [0, 1, 2, 3]
+
+
+def test_assign_rows_extends_categories():
+    col = pd.Series(pd.Categorical(["a", "b", None]))
+    out = assign_rows(col, np.array([2]), pd.Series(pd.Categorical(["z"])))
+    assert out.tolist() == ["a", "b", "z"]
@@ -0,0 +1,16 @@
+# tests/test_wells_export.py
+import numpy as np
+import pytest
+from snapshots import make_basin
+from wells_export import write_export
+from wells_loader import WellSnapshot
+
+
+def test_gpkg_geometry_without_coordinate_columns(tmp_path):
+    gpd = pytest.importorskip("geopandas")
+    snap = WellSnapshot.from_parts([make_basin("A", ["a1", "a2"], Operator=["X", "Y"])])
+    path = str(tmp_path / "wells.gpkg")
+    write_export(path, "gpkg", snap, {"A": np.array([0, 1])}, ["API_UWI", "Operator"])
+    gdf = gpd.read_file(path)
+    assert list(gdf.columns) == ["API_UWI", "Operator", "geometry"]
+    assert gdf.geometry.x.tolist() == [-103.0, -103.0]
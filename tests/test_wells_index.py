@@ -0,0 +1,28 @@
+# tests/test_wells_index.py
+import pytest
+from snapshots import install, make_basin
+from wells_index import neighbors_of_point, neighbors_of_well
+
+
+@pytest.fixture
+def basin():
+    install(make_basin(
+        "IX", ["w1", "w2", "w3"],
+        FirstProdDate=["2020-01-01", "2021-06-01", "2022-03-01"],
+        Latitude_BH=[None, "31.001", "31.002"], Longitude_BH=[None, "-102.99", "-102.99"],
+    ))
+
+
+def test_date_filters_reject_garbage(basin):
+    assert len(neighbors_of_well("w1", since="2021-01-01")["neighbors"]) == 2
+    for bad in ({"since": "soon"}, {"until": "later"}):
+        with pytest.raises(ValueError, match="Invalid"):
+            neighbors_of_well("w1", **bad)
+
+
+def test_midpoint_search_without_lateral_is_an_error(basin):
+    # w1 has no bottom hole, so no midpoint
+    with pytest.raises(ValueError, match="no usable coordinates"):
+        neighbors_of_well("w1", position="lateral")
+    with pytest.raises(ValueError, match="no usable coordinates"):
+        neighbors_of_point(float("nan"), -103.0, basin="IX")
@@ -0,0 +1,112 @@
+# tests/test_wells_loader.py
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import wells_loader
+from snapshots import make_basin
+from wells_loader import RESERVE_ROWS, WellSnapshot, _source_hwm
+
+
+def test_from_parts_merges_conflicting_basins():
+    a = make_basin("A", ["a1", "a2"], Operator=["X", "Y"], TVD_FT=[None, None])
+    b = make_basin("B", ["b1"], lat0=32.0, TVD_FT=["9000"])
+    snap = WellSnapshot.from_parts([b, a])
+    assert snap.basins == ["A", "B"]
+    assert snap.basin_slice("B") == slice(2 + RESERVE_ROWS, 3 + RESERVE_ROWS)
+    assert snap.basin_frame("B")["TVD_FT"].tolist() == [9000.0]
+    assert snap.basin_frame("B")["Operator"].isna().all()
+    assert snap.locate("b1") == 2 + RESERVE_ROWS and snap.locate("zz") is None
+    assert snap.rows == 3
+
+
+def test_empty_snapshot_when_every_basin_fails():
+    snap = WellSnapshot.from_parts([], {"failed_basins": {"A": "boom"}})
+    assert snap.basins == [] and len(snap.frame) == 0
+    assert snap.locate("a1") is None
+
+
+def _two_basins():
+    return WellSnapshot.from_parts([
+        make_basin("A", ["a1", "a2"], Operator=["X", "Y"], TVD_FT=["9000", "9100"]),
+        make_basin("B", ["b1"], lat0=32.0, Operator=["Z"]),
+    ])
+
+
+def _raw(**columns):
+    return pd.DataFrame({k: pd.Series(v, dtype=object) for k, v in columns.items()})
+
+
+def test_upsert_updates_in_place_and_dedupes():
+    snap = _two_basins()
+    new = snap.upsert("A", _raw(
+        API_UWI=["a2", "a2"], Operator=["Old", "New"], Latitude=["31.001"] * 2, Longitude=["-103.0"] * 2,
+    ))
+    assert new.basin_frame("A")["Operator"].tolist() == ["X", "New"]
+    assert snap.basin_frame("A")["Operator"].tolist() == ["X", "Y"]  # readers keep the old rows
+    # untouched columns are shared, not copied
+    assert np.shares_memory(new.frame["TVD_FT"].to_numpy(), snap.frame["TVD_FT"].to_numpy())
+    assert new.basin_stamp("A") > snap.basin_stamp("A") and new.rows == 3
+
+
+def test_upsert_inserts_into_reserve_without_moving_other_basins():
+    snap = _two_basins()
+    new = snap.upsert("A", _raw(API_UWI=["a3"], Operator=["W"], Latitude=["31.01"], Longitude=["-103.0"]))
+    assert new.basin_frame("A")[wells_loader.KEY_COLUMN].astype(str).tolist() == ["a1", "a2", "a3"]
+    assert new.basin_slice("B") == snap.basin_slice("B") and len(new.frame) == len(snap.frame)
+    assert new.locate("a3") == 2 and snap.locate("a3") is None
+    assert new.basin_frame("A")["x"].notna().all()
+
+
+def test_upsert_grows_a_full_reserve(monkeypatch):
+    monkeypatch.setattr(wells_loader, "RESERVE_ROWS", 1)
+    snap = _two_basins()
+    keys = ["a3", "a4", "a5"]
+    new = snap.upsert("A", _raw(API_UWI=keys, Latitude=["31.1"] * 3, Longitude=["-103.0"] * 3))
+    assert new.basin_frame("A")[wells_loader.KEY_COLUMN].astype(str).tolist() == ["a1", "a2"] + keys
+    assert new.basin_frame("B")["Operator"].tolist() == ["Z"]
+    assert new.locate("b1") == new.basin_slice("B").start
+
+
+def test_source_hwm_is_newest_csv_time(tmp_path):
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    a.write_text("x"), b.write_text("x")
+    os.utime(a, (0, 1_700_000_000)), os.utime(b, (0, 1_600_000_000))
+    assert _source_hwm([str(a), str(b), str(tmp_path / "missing.csv")]) == ["2023-11-14T22:13:20+00:00", 0]
+    assert _source_hwm([]) is None
+
+
+def test_save_and_memory_mapped_load(tmp_path):
+    snap = _two_basins().upsert("A", _raw(API_UWI=["a3"], Operator=["W"], Latitude=["31.01"], Longitude=["-103.0"]))
+    path = str(tmp_path / "wells.pkl")
+    snap.save(path)
+    snap.save(path)
+    snap.save(path)
+    assert len(os.listdir(path + ".d")) == 2  # older column dirs are pruned
+    mapped = WellSnapshot.load(path, mmap=True)
+    pd.testing.assert_frame_equal(WellSnapshot.load(path).frame, snap.frame)
+    assert mapped.frame.equals(snap.frame)
+    assert mapped.partitions.equals(snap.partitions) and mapped.locate("a3") == 2
+    assert not mapped.frame["x"].to_numpy().flags.writeable  # served from the mapped file
+
+
+@pytest.fixture
+def fresh_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(wells_loader, "SNAPSHOT_PATH", str(tmp_path / "wells.pkl"))
+    monkeypatch.setattr(wells_loader, "discover_basins", lambda: {})
+    monkeypatch.setattr(wells_loader, "_current", None)
+    monkeypatch.setattr(wells_loader, "_submit_build", None)
+
+
+def test_first_build_is_queued_not_run_inline(fresh_process):
+    queued = []
+    wells_loader.build_in_background(lambda: queued.append(1))
+    snap = wells_loader.current_snapshot()
+    assert queued == [1] and snap.meta["building"] and snap.rows == 0
+    assert wells_loader.current_snapshot() is snap and queued == [1]
+
+
+def test_job_worker_waits_for_the_first_build(fresh_process, monkeypatch):
+    monkeypatch.setattr(wells_loader, "_job_worker", True)
+    with pytest.raises(FileNotFoundError):
+        wells_loader.current_snapshot()
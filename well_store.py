@@ -0,0 +1,417 @@
+# well_store.py
+from __future__ import annotations
+import os
+from typing import Iterable
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# ===============================================================
+# Column layout
+# ===============================================================
+KEY_COLUMN = "API_UWI"
+COORD_COLUMNS = ["Latitude", "Longitude", "Latitude_BH", "Longitude_BH"]
+
+# Identifiers made of digits. They are never numbers: 14-digit UWIs do not
+# survive float32, and leading zeros would be dropped.
+TEXT_COLUMNS = {
+    KEY_COLUMN, "API_UWI_14", "API_UWI_12",
+    "Unformatted_API_UWI", "Unformatted_API_UWI_14", "Unformatted_API_UWI_12",
+    "WellID", "CompletionID", "WellPadID", "WellNumber", "StateFileNumber",
+}
+
+# Wide column groups that are rarely needed on the map; they stay on disk
+# until something asks for one of their columns.
+LAZY_GROUPS: dict[str, list[str]] = {
+    "frac_chemistry": [
+        "AcidVolume_BBL", "Biocide_LBS", "Breaker_LBS", "Buffer_LBS",
+        "ClayControl_LBS", "CrossLinker_LBS", "FrictionReducer_LBS",
+        "GellingAgent_LBS", "IronControl_LBS", "ScaleInhibitor_LBS",
+        "Surfactant_LBS", "Energizer_LBS", "Diverter_LBS",
+    ],
+    "injection": [
+        "FirstInjDate", "LastInjDate", "CumWaterInj_BBL", "CumSteamInj_BBL",
+        "CumGasInj_MCF", "CumSolventInj_BBL", "CumOtherInj_BBL",
+        "CumOtherInj_MCF", "CumulativeSOR", "Last3MonthISOR",
+        "InjectorWellClass",
+    ],
+}
+LAZY_COLUMNS = {c: g for g, cols in LAZY_GROUPS.items() for c in cols}
+
+# Dates are stored as int32 days since 1970-01-01; missing dates use this.
+NO_DATE = np.iinfo(np.int32).min
+EPOCH = np.datetime64("1970-01-01", "D")
+
+DEFAULT_BUDGET_MB = int(os.getenv("WELL_STORE_BUDGET_MB", "768"))
+CSV_CHUNK_ROWS = 20_000
+
+
+# ===============================================================
+# Typing helpers
+# ===============================================================
+def is_date_column(name: str) -> bool:
+    return name.endswith("Date")
+
+
+def to_day_numbers(values: pd.Series) -> np.ndarray:
+    """Parse a string/date column into int32 day numbers (NO_DATE for blanks)."""
+    # format="mixed": rows (especially delta-synced DB text) need not share one format
+    dt = pd.to_datetime(pd.Series(values), errors="coerce", format="mixed", utc=True).dt.tz_localize(None)
+    days = np.full(len(dt), NO_DATE, dtype=np.int32)
+    ok = dt.notna().to_numpy()
+    if ok.any():
+        days[ok] = (dt[ok].to_numpy().astype("datetime64[D]") - EPOCH).astype(np.int32)
+    return days
+
+
+def from_day_numbers(days: np.ndarray) -> pd.Series:
+    """Inverse of to_day_numbers; NO_DATE becomes NaT."""
+    days = np.asarray(days)
+    out = (EPOCH + days.astype("timedelta64[D]")).astype("datetime64[ns]")
+    out[days == NO_DATE] = np.datetime64("NaT")
+    return pd.Series(out)
+
+
+def text_categorical(values) -> pd.Categorical:
+    """Categorical with string categories, whatever the input dtype (all-null included)."""
+    s = pd.Series(values).astype(object)
+    filled = s.notna()
+    s[filled] = s[filled].astype(str)
+    return pd.Categorical(s, categories=pd.Index(pd.unique(s[filled]), dtype=object))
+
+
+def _chunk_kinds(chunk: pd.DataFrame) -> dict[str, str]:
+    """Storage kind per column as seen in one chunk ("blank" if all empty)."""
+    kinds = {}
+    for c in chunk.columns:
+        if c in TEXT_COLUMNS:
+            kinds[c] = "category"
+        elif c in COORD_COLUMNS:
+            kinds[c] = "float32"
+        elif is_date_column(c):
+            kinds[c] = "date"
+        else:
+            col = chunk[c]
+            filled = col.notna()
+            if not filled.any():
+                kinds[c] = "blank"
+            elif pd.to_numeric(col[filled], errors="coerce").notna().all():
+                kinds[c] = "float32"
+            else:
+                kinds[c] = "category"  # any text at all: numeric coercion would lose it
+    return kinds
+
+
+def _merge_kinds(kinds: dict[str, str], chunk_kinds: dict[str, str]) -> dict[str, str]:
+    for c, kind in chunk_kinds.items():
+        prev = kinds.get(c, "blank")
+        if "category" in (prev, kind):
+            kinds[c] = "category"
+        elif kind != "blank":
+            kinds[c] = kind
+        else:
+            kinds[c] = prev
+    return kinds
+
+
+def _final_kinds(kinds: dict[str, str]) -> dict[str, str]:
+    return {c: "category" if k == "blank" else k for c, k in kinds.items()}
+
+
+def _infer_kinds(sample: pd.DataFrame) -> dict[str, str]:
+    """Decide how each column of an in-memory frame is stored."""
+    return _final_kinds(_chunk_kinds(sample))
+
+
+def scan_kinds(path: str, usecols=None) -> dict[str, str]:
+    """Decide storage kinds from a pass over the whole file, not just its first chunk."""
+    kinds: dict[str, str] = {}
+    for chunk in pd.read_csv(path, dtype=str, usecols=usecols, chunksize=CSV_CHUNK_ROWS):
+        chunk.columns = chunk.columns.str.strip()
+        settled = [c for c in chunk.columns if kinds.get(c) == "category"]
+        _merge_kinds(kinds, _chunk_kinds(chunk.drop(columns=settled)))
+    return _final_kinds(kinds)
+
+
+def compact_frame(raw: pd.DataFrame, kinds: dict[str, str] | None = None) -> pd.DataFrame:
+    """Convert a raw string frame to the compact dtypes used by the store."""
+    kinds = kinds or _infer_kinds(raw)
+    out = {}
+    for c in raw.columns:
+        kind = kinds.get(c, "category")
+        if kind == "float32":
+            vals = pd.to_numeric(raw[c], errors="coerce")
+            if (vals.isna() & raw[c].notna()).any():
+                # Text where numbers were expected: keep it rather than drop it
+                out[c] = text_categorical(raw[c])
+            else:
+                out[c] = vals.astype(np.float32)
+        elif kind == "date":
+            out[c] = to_day_numbers(raw[c])
+        else:
+            out[c] = text_categorical(raw[c])
+    return pd.DataFrame(out, index=raw.index)
+
+
+def _all_null(col: pd.Series) -> bool:
+    return not col.notna().any()
+
+
+def harmonize_frames(frames: list[pd.DataFrame]) -> list[pd.DataFrame]:
+    """
+    Give independently typed frames (one per basin) the same columns and one
+    dtype per column so they can be concatenated. Where a column is numeric
+    in one frame and categorical in another, numeric wins if the categorical
+    side is empty; otherwise both become string categories.
+    """
+    columns: list[str] = []
+    for f in frames:
+        columns += [c for c in f.columns if c not in columns]
+    kinds = {}
+    for c in columns:
+        present = [f[c] for f in frames if c in f.columns]
+        cats = [p for p in present if isinstance(p.dtype, pd.CategoricalDtype)]
+        if is_date_column(c) and not cats:
+            kinds[c] = "date"
+        elif not cats:
+            kinds[c] = "float32"
+        elif len(cats) < len(present) and all(_all_null(p) for p in cats):
+            kinds[c] = "float32"
+        else:
+            kinds[c] = "category"
+
+    out = []
+    for f in frames:
+        f = f.copy(deep=False)
+        for c in columns:
+            kind = kinds[c]
+            if c not in f.columns:
+                if kind == "category":
+                    f[c] = pd.Categorical([None] * len(f), categories=pd.Index([], dtype=object))
+                elif kind == "date":
+                    f[c] = np.full(len(f), NO_DATE, dtype=np.int32)
+                else:
+                    f[c] = np.full(len(f), np.nan, dtype=np.float32)
+                continue
+            col = f[c]
+            is_cat = isinstance(col.dtype, pd.CategoricalDtype)
+            if kind == "category":
+                if not is_cat:
+                    vals = from_day_numbers(col.to_numpy()) if is_date_column(c) else col
+                    f[c] = text_categorical(vals)
+                elif col.cat.categories.dtype != object:
+                    f[c] = text_categorical(col)
+            elif kind == "float32" and is_cat:
+                f[c] = np.full(len(f), np.nan, dtype=np.float32)
+        out.append(f[columns])
+    return out
+
+
+def assign_rows(col: pd.Series, rows: np.ndarray, values: pd.Series) -> pd.Series:
+    """
+    Column with `values` written at `rows`. Returns `col` itself when nothing
+    changes, so untouched columns stay shared; otherwise a modified copy.
+    """
+    if not len(rows):
+        return col
+    is_cat = isinstance(col.dtype, pd.CategoricalDtype)
+    if is_cat or isinstance(values.dtype, pd.CategoricalDtype):
+        old = col.iloc[rows].astype(object).where(col.iloc[rows].notna(), None).to_numpy()
+        vals = values.astype(object).where(values.notna(), None).to_numpy()
+        if np.array_equal(old, vals):
+            return col
+        col = col if is_cat else pd.Series(text_categorical(col), index=col.index)
+        text = pd.Series(vals, dtype=object)
+        text[text.notna()] = text[text.notna()].astype(str)
+        extra = pd.Index(pd.unique(text.dropna()), dtype=object).difference(col.cat.categories)
+        cats = col.cat.categories.append(extra) if len(extra) else col.cat.categories
+        codes = col.cat.codes.to_numpy().astype(np.int32)
+        codes[rows] = pd.Categorical(text, categories=cats).codes
+        return pd.Series(pd.Categorical.from_codes(codes, cats), index=col.index)
+    vals = values.to_numpy().astype(col.dtype)
+    old = col.to_numpy()
+    if np.array_equal(old[rows], vals, equal_nan=np.issubdtype(old.dtype, np.floating)):
+        return col
+    out = old.copy()
+    out[rows] = vals
+    return pd.Series(out, index=col.index)
+
+
+def concat_compact(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate compact frames, merging category dictionaries per column."""
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    out = {}
+    for c in frames[0].columns:
+        parts = [f[c] for f in frames]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            out[c] = pd.Series(union_categoricals(parts, ignore_order=True))
+        else:
+            out[c] = pd.Series(np.concatenate([p.to_numpy() for p in parts]))
+    return pd.DataFrame(out)
+
+
+def read_compact_csv(path: str, usecols: Iterable[str] | None = None) -> pd.DataFrame:
+    """Stream a wells CSV in chunks so the raw string frame never exists whole."""
+    if usecols is None:
+        wanted = lambda c: c.strip() not in LAZY_COLUMNS
+    else:
+        keep = set(usecols)
+        wanted = lambda c: c.strip() in keep
+    kinds = scan_kinds(path, wanted)
+    frames = []
+    for chunk in pd.read_csv(path, dtype=str, usecols=wanted, chunksize=CSV_CHUNK_ROWS):
+        chunk.columns = chunk.columns.str.strip()
+        frames.append(compact_frame(chunk, kinds))
+    if not frames:
+        return pd.DataFrame()
+    return concat_compact(frames)
+
+
+def _column_bytes(col: pd.Series) -> int:
+    return int(col.memory_usage(index=False, deep=True))
+
+
+# ===============================================================
+# Store
+# ===============================================================
+class WellStore:
+    """
+    Compact, column-oriented in-memory well table.
+    Core columns are loaded eagerly; LAZY_GROUPS are read from the source
+    CSVs on first access and evicted oldest-first when over budget.
+    """
+
+    def __init__(
+        self,
+        frame: pd.DataFrame,
+        sources: dict[str, str] | None = None,
+        budget_mb: int = DEFAULT_BUDGET_MB,
+    ):
+        # reset_index deep-copies; skip it when the index is already 0..n-1
+        self.frame = frame if frame.index.equals(pd.RangeIndex(len(frame))) else frame.reset_index(drop=True)
+        self.sources = dict(sources or {})  # basin -> wells CSV path
+        self.budget_bytes = int(budget_mb) * 1024 * 1024
+        self._groups: dict[str, pd.DataFrame] = {}
+        self._group_order: list[str] = []
+
+    @classmethod
+    def from_csv(cls, path: str, basin: str, budget_mb: int = DEFAULT_BUDGET_MB) -> "WellStore":
+        frame = read_compact_csv(path)
+        frame["basin"] = pd.Categorical([basin] * len(frame))
+        return cls(frame, sources={basin: path}, budget_mb=budget_mb)
+
+    def with_frame(self, frame: pd.DataFrame, groups: dict[str, pd.DataFrame] | None = None) -> "WellStore":
+        """A store over a new core frame that keeps this store's loaded lazy groups."""
+        store = WellStore(frame, self.sources)
+        store.budget_bytes = self.budget_bytes
+        store._groups = dict(self._groups if groups is None else groups)
+        store._group_order = [g for g in self._group_order if g in store._groups]
+        return store
+
+    # ---------- Public API ----------
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.frame.columns) + [c for c in LAZY_COLUMNS if c not in self.frame.columns]
+
+    def column(self, name: str) -> pd.Series:
+        """Return a column, loading its lazy group if needed."""
+        if name in self.frame.columns:
+            return self.frame[name]
+        group = LAZY_COLUMNS.get(name)
+        if group is None:
+            raise KeyError(name)
+        return self.load_group(group)[name]
+
+    def dates(self, name: str) -> pd.Series:
+        """Return a date column decoded back to datetime64."""
+        return from_day_numbers(self.column(name).to_numpy())
+
+    def load_group(self, group: str) -> pd.DataFrame:
+        if group in self._groups:
+            self._group_order.remove(group)
+            self._group_order.append(group)
+            return self._groups[group]
+
+        cols = LAZY_GROUPS[group]
+        parts = []
+        for basin, path in self.sources.items():
+            part = read_compact_csv(path, usecols=[KEY_COLUMN, *cols])
+            part["basin"] = basin
+            parts.append(part)
+        loaded = self._align(parts, cols)
+        self._groups[group] = loaded
+        self._group_order.append(group)
+        print(f"📦 Loaded column group '{group}' ({_frame_bytes(loaded) / 1e6:.1f} MB)")
+        self.enforce_budget(keep=group)
+        return loaded
+
+    def drop_group(self, group: str):
+        if group in self._groups:
+            del self._groups[group]
+            self._group_order.remove(group)
+
+    @property
+    def nbytes(self) -> int:
+        return _frame_bytes(self.frame) + sum(_frame_bytes(g) for g in self._groups.values())
+
+    def enforce_budget(self, keep: str | None = None):
+        """Evict lazy groups (oldest first) until the store fits its budget."""
+        for group in list(self._group_order):
+            if self.nbytes <= self.budget_bytes:
+                break
+            if group != keep:
+                print(f"♻️  Evicting column group '{group}' to stay under budget")
+                self.drop_group(group)
+        if self.nbytes > self.budget_bytes:
+            print(
+                f"⚠️ Well store uses {self.nbytes / 2**20:.0f} MiB, "
+                f"over its {self.budget_bytes / 2**20:.0f} MiB budget"
+            )
+
+    def memory_report(self) -> pd.DataFrame:
+        """Bytes per column, largest first."""
+        rows = [
+            (c, str(self.frame[c].dtype), _column_bytes(self.frame[c]), "core")
+            for c in self.frame.columns
+        ]
+        for group, df in self._groups.items():
+            rows += [(c, str(df[c].dtype), _column_bytes(df[c]), group) for c in df.columns]
+        report = pd.DataFrame(rows, columns=["column", "dtype", "bytes", "group"])
+        return report.sort_values("bytes", ascending=False, ignore_index=True)
+
+    # ---------- Internals ----------
+    def _align(self, parts: list[pd.DataFrame], cols: list[str]) -> pd.DataFrame:
+        """Reorder a freshly read group so its rows line up with self.frame."""
+        if not parts:
+            return pd.DataFrame(index=self.frame.index, columns=cols)
+        loaded = concat_compact(harmonize_frames(parts))
+        keys = pd.MultiIndex.from_arrays(
+            [loaded["basin"].astype(str), loaded[KEY_COLUMN].astype(str)]
+        )
+        first = ~keys.duplicated()
+        keys, loaded = keys[first], loaded[first].reset_index(drop=True)
+        target = pd.MultiIndex.from_arrays(
+            [self.frame["basin"].astype(str), self.frame[KEY_COLUMN].astype(str)]
+        )
+        pos = keys.get_indexer(target)
+        out = {}
+        for c in cols:
+            if c not in loaded.columns:
+                continue
+            col = loaded[c]
+            if isinstance(col.dtype, pd.CategoricalDtype):
+                codes = np.where(pos >= 0, col.cat.codes.to_numpy()[pos], -1)
+                out[c] = pd.Categorical.from_codes(codes, col.cat.categories)
+            else:
+                fill = NO_DATE if is_date_column(c) else np.nan
+                vals = col.to_numpy()
+                out[c] = np.where(pos >= 0, vals[pos], fill).astype(vals.dtype)
+        return pd.DataFrame(out, index=self.frame.index)
+
+
+def _frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=False, deep=True).sum())
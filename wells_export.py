@@ -0,0 +1,173 @@
+# wells_export.py
+from __future__ import annotations
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from well_store import LAZY_COLUMNS, from_day_numbers, is_date_column
+from wells_index import select_rows
+from wells_loader import HERE, PROJECTED_COLUMNS, WellSnapshot, current_snapshot
+
+EXPORT_DIR = os.getenv("WELLS_EXPORT_DIR", os.path.join(HERE, "data", "exports"))
+EXPORT_CHUNK_ROWS = 5_000
+EXPORT_INLINE_MAX = int(os.getenv("WELLS_EXPORT_INLINE_MAX", "20000"))  # larger CSVs become jobs
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "gpkg": ".gpkg"}
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "gpkg": "application/geopackage+sqlite3",
+}
+
+
+# ===============================================================
+# Chunked row source
+# ===============================================================
+def export_columns(snap: WellSnapshot, columns: list[str] | None = None) -> list[str]:
+    """
+    Requested columns, or by default every core column minus projected
+    helpers. Lazy-group columns are exported only when asked for by name.
+    """
+    if not columns:
+        return [c for c in snap.frame.columns if c not in PROJECTED_COLUMNS]
+    everything = {c for c in snap.store.columns if c not in PROJECTED_COLUMNS}
+    unknown = [c for c in columns if c not in everything]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    return list(columns)
+
+
+def needs_lazy_groups(columns: list[str]) -> bool:
+    """True if writing these columns would read lazy groups from the basin CSVs."""
+    return any(c in LAZY_COLUMNS for c in columns)
+
+
+def iter_chunks(snap: WellSnapshot, selection: dict[str, np.ndarray], columns: list[str]):
+    """Yield decoded DataFrames of at most EXPORT_CHUNK_ROWS rows."""
+    # Hold references up front so a budget eviction mid-export cannot drop them
+    sources = {c: snap.store.column(c) for c in columns}
+    for basin, rows in selection.items():
+        global_rows = rows + snap.basin_slice(basin).start
+        for s in range(0, len(global_rows), EXPORT_CHUNK_ROWS):
+            idx = global_rows[s:s + EXPORT_CHUNK_ROWS]
+            out = {}
+            for c in columns:
+                col = sources[c].iloc[idx]
+                if isinstance(col.dtype, pd.CategoricalDtype):
+                    out[c] = col.astype(object).where(col.notna(), None).to_numpy()
+                elif is_date_column(c):
+                    out[c] = from_day_numbers(col.to_numpy()).to_numpy()
+                else:
+                    out[c] = col.to_numpy()
+            yield pd.DataFrame(out)
+
+
+def count_rows(selection: dict[str, np.ndarray]) -> int:
+    return int(sum(len(r) for r in selection.values()))
+
+
+# ===============================================================
+# Writers
+# ===============================================================
+def stream_csv(snap: WellSnapshot, selection: dict[str, np.ndarray], columns: list[str]):
+    """CSV text in chunks, for StreamingResponse."""
+    first = True
+    for chunk in iter_chunks(snap, selection, columns):
+        yield chunk.to_csv(index=False, header=first)
+        first = False
+    if first:
+        yield pd.DataFrame(columns=columns).to_csv(index=False)
+
+
+def _arrow_schema(snap: WellSnapshot, columns: list[str]):
+    import pyarrow as pa
+
+    fields = []
+    for c in columns:
+        if is_date_column(c):
+            fields.append(pa.field(c, pa.timestamp("ms")))
+        elif not isinstance(snap.store.column(c).dtype, pd.CategoricalDtype):
+            fields.append(pa.field(c, pa.float32()))
+        else:
+            fields.append(pa.field(c, pa.string()))
+    return pa.schema(fields)
+
+
+def write_export(
+    path: str,
+    fmt: str,
+    snap: WellSnapshot,
+    selection: dict[str, np.ndarray],
+    columns: list[str],
+    progress=None,
+):
+    """Write chunk by chunk so memory stays flat regardless of export size."""
+    total, done = count_rows(selection), 0
+    base, ext = os.path.splitext(path)
+    tmp = f"{base}.part{ext}"  # GDAL picks the GPKG driver by extension
+    if fmt == "csv":
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            for text in stream_csv(snap, selection, columns):
+                f.write(text)
+                done = min(total, done + EXPORT_CHUNK_ROWS)
+                if progress:
+                    progress(done, total)
+    elif fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = _arrow_schema(snap, columns)
+        with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+            for chunk in iter_chunks(snap, selection, columns):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+    elif fmt == "gpkg":
+        import geopandas as gpd
+
+        first = True
+        # Geometry always comes from the store, whether or not the coordinates were asked for
+        extra = [c for c in ("Longitude", "Latitude") if c not in columns]
+        for chunk in iter_chunks(snap, selection, columns + extra):
+            geom = gpd.points_from_xy(
+                pd.to_numeric(chunk["Longitude"], errors="coerce"),
+                pd.to_numeric(chunk["Latitude"], errors="coerce"),
+                crs="EPSG:4326",
+            )
+            gdf = gpd.GeoDataFrame(chunk.drop(columns=extra), geometry=geom)
+            gdf.to_file(tmp, driver="GPKG", layer="wells", mode="w" if first else "a")
+            first = False
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+    else:
+        raise ValueError(f"Unknown export format {fmt!r}")
+    os.replace(tmp, path)
+
+
+# ===============================================================
+# Background export job (runs in the jobs.py process pool)
+# ===============================================================
+def export_job(fmt: str, filters: dict, columns: list[str] | None = None) -> dict:
+    """
+    Resolve filters against this worker's snapshot and write the export.
+    The file name hashes the snapshot version, so a changed snapshot never
+    reuses an older file.
+    """
+    from jobs import report_progress
+
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {sorted(FORMATS)}")
+    snap = current_snapshot()
+    columns = export_columns(snap, columns)
+    selection = select_rows(snap, **filters)
+    stamp = float(snap.partitions["built_at"].max()) if len(snap.partitions) else 0.0
+    digest = hashlib.sha1(
+        json.dumps([fmt, filters, columns, stamp], sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()[:16]
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    path = os.path.join(EXPORT_DIR, f"wells_{digest}{FORMATS[fmt]}")
+    write_export(path, fmt, snap, selection, columns, report_progress)
+    print(f"✅ Export wrote {count_rows(selection)} wells to {path}")
+    return {"path": path, "format": fmt, "rows": count_rows(selection)}
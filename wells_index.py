@@ -0,0 +1,457 @@
+# wells_index.py
+from __future__ import annotations
+import json
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from benches_data import bench_key
+from geometry import parse_polygon, points_in_rings, segments_cross_rings
+from well_store import KEY_COLUMN, NO_DATE, to_day_numbers
+from wells_loader import WellSnapshot, current_snapshot
+
+POSITIONS = ("surface", "lateral")
+MAX_K = 500
+
+
+# ===============================================================
+# Per-basin KD-trees
+# ===============================================================
+class BasinIndex:
+    """KD-trees over one basin's projected surface holes and lateral midpoints."""
+
+    def __init__(self, snap: WellSnapshot, basin: str):
+        self.basin = basin
+        part = snap.basin_frame(basin)
+        self.trees: dict[str, cKDTree] = {}
+        self.ids: dict[str, np.ndarray] = {}
+        for pos, (xc, yc) in {"surface": ("x", "y"), "lateral": ("mid_x", "mid_y")}.items():
+            xy = np.column_stack([
+                part[xc].to_numpy(dtype=np.float64), part[yc].to_numpy(dtype=np.float64)
+            ])
+            ok = np.isfinite(xy).all(axis=1)
+            self.ids[pos] = np.flatnonzero(ok)  # tree position -> basin row
+            self.trees[pos] = cKDTree(xy[ok])
+        half = np.hypot(
+            part["toe_x"].to_numpy(dtype=np.float64) - part["heel_x"].to_numpy(dtype=np.float64),
+            part["toe_y"].to_numpy(dtype=np.float64) - part["heel_y"].to_numpy(dtype=np.float64),
+        ) / 2
+        self.max_half_lateral = float(np.nanmax(half)) if np.isfinite(half).any() else 0.0
+        # Normalised bench / status codes so filters compare ints, not strings
+        self.bench_codes, self.bench_lookup = _codes(part, "ENVInterval", bench_key)
+        self.status_codes, self.status_lookup = _codes(part, "ENVWellStatus", lambda s: s.strip().lower())
+        # Extent covers bottom holes too, so polygons touching only laterals still match
+        lat = np.concatenate([part[c].to_numpy(dtype=np.float64) for c in ("Latitude", "Latitude_BH") if c in part])
+        lon = np.concatenate([part[c].to_numpy(dtype=np.float64) for c in ("Longitude", "Longitude_BH") if c in part])
+        self.bbox = (np.nanmin(lon), np.nanmin(lat), np.nanmax(lon), np.nanmax(lat)) if len(part) else None
+
+    def contains(self, lon: float, lat: float) -> bool:
+        if self.bbox is None:
+            return False
+        return self.bbox[0] <= lon <= self.bbox[2] and self.bbox[1] <= lat <= self.bbox[3]
+
+    def intersects(self, bbox: tuple) -> bool:
+        if self.bbox is None:
+            return False
+        return not (bbox[2] < self.bbox[0] or bbox[0] > self.bbox[2]
+                    or bbox[3] < self.bbox[1] or bbox[1] > self.bbox[3])
+
+    def candidates(self, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+        """Basin rows whose surface hole or lateral could touch the box."""
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        r = float(np.hypot(x1 - x0, y1 - y0)) / 2
+        found = [self.ids["surface"][self.trees["surface"].query_ball_point([cx, cy], r)]]
+        found.append(
+            self.ids["lateral"][self.trees["lateral"].query_ball_point([cx, cy], r + self.max_half_lateral)]
+        )
+        return np.unique(np.concatenate(found).astype(int))
+
+    def query(self, x: float, y: float, k: int, keep: np.ndarray | None, position: str = "surface"):
+        """
+        k nearest basin rows to (x, y), skipping rows where keep is False.
+        Widens the search until k matches are found or the tree is exhausted.
+        """
+        tree, ids = self.trees[position], self.ids[position]
+        n = tree.n
+        if n == 0:
+            return np.zeros(0, dtype=int), np.zeros(0)
+        want = min(n, k if keep is None else k * 4)
+        while True:
+            dist, idx = tree.query([x, y], k=want)
+            dist, idx = np.atleast_1d(dist), np.atleast_1d(idx)
+            ok = idx < n
+            rows, dist = ids[idx[ok]], dist[ok]
+            if keep is not None:
+                sel = keep[rows]
+                rows, dist = rows[sel], dist[sel]
+            if len(rows) >= k or want >= n:
+                return rows[:k], dist[:k]
+            want = min(n, want * 4)
+
+
+def _codes(part: pd.DataFrame, column: str, normalise) -> tuple[np.ndarray, dict[str, int]]:
+    """Per-row code of the normalised value (-1 when missing) and name -> code."""
+    if column not in part:
+        return np.full(len(part), -1, dtype=np.int32), {}
+    col = part[column]
+    col = col if isinstance(col.dtype, pd.CategoricalDtype) else col.astype("category")
+    names = col.cat.categories.map(lambda v: normalise(str(v)))  # once per category, not per row
+    per_category, uniques = pd.factorize(names)
+    raw = col.cat.codes.to_numpy()
+    codes = np.where(raw >= 0, per_category[np.maximum(raw, 0)], -1).astype(np.int32)
+    return codes, {str(name): i for i, name in enumerate(uniques)}
+
+
+def codes_mask(codes: np.ndarray, lookup: dict[str, int], wanted) -> np.ndarray:
+    table = np.zeros(len(lookup) + 1, dtype=bool)  # last slot: code -1 (missing)
+    table[[lookup[w] for w in wanted if w in lookup]] = True
+    return table[codes]
+
+
+@lru_cache(maxsize=64)
+def _cached_index(basin: str, basin_stamp: float) -> BasinIndex:
+    return BasinIndex(current_snapshot(), basin)
+
+
+def basin_index(basin: str) -> BasinIndex:
+    """KD-trees for a basin; rebuilt only when that basin's rows change."""
+    return _cached_index(basin, current_snapshot().basin_stamp(basin))
+
+
+def basin_for_point(snap: WellSnapshot, lon: float, lat: float) -> str | None:
+    """Basin whose well extent contains the point (nearest origin on ties)."""
+    hits = [b for b in snap.basins if basin_index(b).contains(lon, lat)] or snap.basins
+    if not hits:
+        return None
+    parts = snap.partitions.loc[hits]
+    d = np.hypot(parts["origin_lon"] - lon, parts["origin_lat"] - lat)
+    return str(d.idxmin())
+
+
+# ===============================================================
+# Filters + neighbor queries
+# ===============================================================
+def filter_mask(
+    part: pd.DataFrame,
+    bench: str | None = None,
+    status: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    date_column: str = "FirstProdDate",
+    dev_class: str | None = None,
+) -> np.ndarray | None:
+    """Boolean mask over basin rows, or None when no filter is set."""
+    keep = np.ones(len(part), dtype=bool)
+    active = False
+    if dev_class and len(part):
+        from parent_child import basin_classes  # parent_child builds on this module
+
+        wanted = {c.strip().lower() for c in dev_class.split(",")}
+        basin = str(part["basin"].iloc[0])
+        classes = basin_classes(basin)  # cached job output only, never classified inline
+        if classes is None:
+            raise ValueError(f"Development classes for {basin} are still being computed; retry shortly")
+        classes = classes["dev_class"]
+        lookup = {c: i for i, c in enumerate(classes.cat.categories)}
+        keep &= codes_mask(classes.cat.codes.to_numpy(), lookup, wanted)
+        active = True
+    if (bench or status) and len(part):
+        index = basin_index(str(part["basin"].iloc[0]))
+        if bench:
+            wanted = {bench_key(b) for b in bench.split(",")}
+            keep &= codes_mask(index.bench_codes, index.bench_lookup, wanted)
+        if status:
+            wanted = {s.strip().lower() for s in status.split(",")}
+            keep &= codes_mask(index.status_codes, index.status_lookup, wanted)
+    active = active or bool(bench or status)
+    if since or until:
+        days = part[date_column].to_numpy()
+        keep &= days != NO_DATE
+        if since:
+            keep &= days >= _filter_day(since, "since")
+        if until:
+            keep &= days <= _filter_day(until, "until")
+        active = True
+    return keep if active else None
+
+
+def _filter_day(value: str, name: str) -> int:
+    day = int(to_day_numbers(pd.Series([value]))[0])
+    if day == NO_DATE:
+        raise ValueError(f"Invalid {name} date {value!r}")
+    return day
+
+
+def _check_origin(x: float, y: float, what: str) -> None:
+    """cKDTree rejects NaN origins; say which location is missing instead."""
+    if not (np.isfinite(x) and np.isfinite(y)):
+        raise ValueError(f"{what} has no usable coordinates")
+
+
+def _bearing(dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    """Degrees clockwise from grid north."""
+    return (np.degrees(np.arctan2(dx, dy)) + 360.0) % 360.0
+
+
+def _neighbor_records(snap: WellSnapshot, index: BasinIndex, rows, dist, x, y, position) -> list[dict]:
+    part = snap.basin_frame(index.basin)
+    xc, yc = ("x", "y") if position == "surface" else ("mid_x", "mid_y")
+    dx = part[xc].to_numpy(dtype=np.float64)[rows] - x
+    dy = part[yc].to_numpy(dtype=np.float64)[rows] - y
+    out = pd.DataFrame({
+        "api_uwi": part[KEY_COLUMN].iloc[rows].astype(str).to_numpy(),
+        "well_name": part["WellName"].iloc[rows].astype(str).to_numpy() if "WellName" in part else None,
+        "interval": part["ENVInterval"].iloc[rows].astype(str).to_numpy() if "ENVInterval" in part else None,
+        "status": part["ENVWellStatus"].iloc[rows].astype(str).to_numpy() if "ENVWellStatus" in part else None,
+        "latitude": part["Latitude"].iloc[rows].to_numpy(dtype=np.float64),
+        "longitude": part["Longitude"].iloc[rows].to_numpy(dtype=np.float64),
+        "distance_ft": np.round(dist, 1),
+        "bearing_deg": np.round(_bearing(dx, dy), 1),
+    })
+    return out.replace({np.nan: None}).to_dict(orient="records")
+
+
+def neighbors_of_well(api_uwi: str, k: int = 10, position: str = "surface", **filters) -> dict:
+    """k nearest wells to an existing well (the well itself is excluded)."""
+    if position not in POSITIONS:
+        raise ValueError(f"position must be one of {POSITIONS}")
+    snap = current_snapshot()
+    row = snap.locate(api_uwi)
+    if row is None:
+        raise KeyError(api_uwi)
+    basin = str(snap.frame["basin"].iloc[row])
+    index = basin_index(basin)
+    part = snap.basin_frame(basin)
+    local = row - snap.basin_slice(basin).start
+    xc, yc = ("x", "y") if position == "surface" else ("mid_x", "mid_y")
+    x, y = float(part[xc].iloc[local]), float(part[yc].iloc[local])
+    _check_origin(x, y, f"Well {api_uwi} ({position})")
+
+    keep = filter_mask(part, **filters)
+    keep = np.ones(len(part), dtype=bool) if keep is None else keep
+    keep[local] = False
+    k = max(1, min(int(k), MAX_K))
+    rows, dist = index.query(x, y, k, keep, position)
+    return {
+        "api_uwi": api_uwi,
+        "basin": basin,
+        "neighbors": _neighbor_records(snap, index, rows, dist, x, y, position),
+    }
+
+
+def neighbors_of_point(
+    lat: float, lon: float, k: int = 10, basin: str | None = None, position: str = "surface", **filters
+) -> dict:
+    """k nearest wells to an arbitrary (proposed) location."""
+    if position not in POSITIONS:
+        raise ValueError(f"position must be one of {POSITIONS}")
+    snap = current_snapshot()
+    basin = basin or basin_for_point(snap, lon, lat)
+    if basin not in snap.partitions.index:
+        raise ValueError(f"Unknown basin {basin!r}")
+    index = basin_index(basin)
+    part = snap.basin_frame(basin)
+    px, py = snap.project(basin, [lon], [lat])
+    x, y = float(px[0]), float(py[0])
+    _check_origin(x, y, f"Point ({lat}, {lon})")
+    k = max(1, min(int(k), MAX_K))
+    rows, dist = index.query(x, y, k, filter_mask(part, **filters), position)
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "basin": basin,
+        "neighbors": _neighbor_records(snap, index, rows, dist, x, y, position),
+    }
+
+
+# ===============================================================
+# Polygon selection
+# ===============================================================
+def rows_within(snap: WellSnapshot, polygon: dict, basins: list[str] | None = None):
+    """
+    Yield (basin, basin rows) for wells whose surface hole is inside the
+    polygon or whose lateral touches it. Candidates are pruned with the
+    KD-trees before the exact vectorized tests.
+    """
+    polys = parse_polygon(polygon)
+    rings = [ring for poly in polys for ring in poly]
+    allv = np.vstack(rings)
+    bbox = (allv[:, 0].min(), allv[:, 1].min(), allv[:, 0].max(), allv[:, 1].max())
+
+    for basin in basins or snap.basins:
+        if basin not in snap.partitions.index:
+            continue
+        index = basin_index(basin)
+        if not index.intersects(bbox):
+            continue
+        projected = []
+        for ring in rings:
+            x, y = snap.project(basin, ring[:, 0], ring[:, 1])
+            projected.append(np.column_stack([x, y]).astype(np.float64))
+        pts = np.vstack(projected)
+        cand = index.candidates(pts[:, 0].min(), pts[:, 1].min(), pts[:, 0].max(), pts[:, 1].max())
+        if not len(cand):
+            continue
+
+        part = snap.basin_frame(basin)
+        col = lambda c: part[c].to_numpy(dtype=np.float64)[cand]
+        hx, hy, tx, ty = col("heel_x"), col("heel_y"), col("toe_x"), col("toe_y")
+        hit = points_in_rings(col("x"), col("y"), projected)
+        rest = ~hit
+        if rest.any():
+            lateral = points_in_rings(hx[rest], hy[rest], projected)
+            lateral |= segments_cross_rings(hx[rest], hy[rest], tx[rest], ty[rest], projected)
+            hit[rest] = lateral
+        if hit.any():
+            yield basin, cand[hit]
+
+
+def _facet_mask(part: pd.DataFrame, facets: dict) -> np.ndarray:
+    """Facets: {column: [values]} for categories or {column: {"min", "max"}} for numbers."""
+    keep = np.ones(len(part), dtype=bool)
+    for col, want in (facets or {}).items():
+        if col not in part:
+            raise ValueError(f"Unknown facet column {col!r}")
+        if isinstance(want, dict):
+            vals = part[col].to_numpy(dtype=np.float64)
+            if want.get("min") is not None:
+                keep &= vals >= float(want["min"])
+            if want.get("max") is not None:
+                keep &= vals <= float(want["max"])
+        else:
+            wanted = {str(v) for v in (want if isinstance(want, list) else [want])}
+            keep &= part[col].astype(str).isin(wanted).to_numpy()
+    return keep
+
+
+def _parse_bbox(bbox) -> dict:
+    if isinstance(bbox, str):
+        bbox = [float(v) for v in bbox.split(",")]
+    x0, y0, x1, y1 = (float(v) for v in bbox)
+    return {"type": "Polygon", "coordinates": [[[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]]}
+
+
+def select_rows(
+    snap: WellSnapshot,
+    basin=None,
+    bbox=None,
+    polygon: dict | None = None,
+    benches=None,
+    facets: dict | None = None,
+    dev_class: str | None = None,
+) -> dict[str, np.ndarray]:
+    """Basin rows matching the map filters (area, basin, benches, facets)."""
+    basins = basin.split(",") if isinstance(basin, str) else basin
+    basins = [b for b in (basins or snap.basins) if b in snap.partitions.index]
+    area = polygon or (_parse_bbox(bbox) if bbox is not None else None)
+    if area is not None:
+        candidates = dict(rows_within(snap, area, basins))
+    else:
+        candidates = {b: np.arange(len(snap.basin_frame(b))) for b in basins}
+    if isinstance(benches, list):
+        benches = ",".join(benches)
+
+    out = {}
+    for b, rows in candidates.items():
+        part = snap.basin_frame(b)
+        keep = filter_mask(part, bench=benches, dev_class=dev_class)
+        keep = np.ones(len(part), dtype=bool) if keep is None else keep
+        if facets:
+            keep &= _facet_mask(part, facets)
+        rows = rows[keep[rows]]
+        if len(rows):
+            out[b] = rows
+    return out
+
+
+PRODUCTION_COLUMNS = ["First12MonthProd_BOE", "CumProd_BOE"]
+PERCENTILES = [10, 50, 90]
+
+
+def _select_columns(part: pd.DataFrame, rows: np.ndarray) -> pd.DataFrame:
+    def pick(c, numeric=False):
+        if c not in part:
+            return np.full(len(rows), np.nan) if numeric else None
+        s = part[c].iloc[rows]
+        if numeric:
+            return s.to_numpy(dtype=np.float64)
+        return s.astype(object).where(s.notna(), None).to_numpy()  # None, not "nan"
+
+    return pd.DataFrame({
+        "api_uwi": pick(KEY_COLUMN),
+        "well_name": pick("WellName"),
+        "basin": pick("basin"),
+        "interval": pick("ENVInterval"),
+        "status": pick("ENVWellStatus"),
+        "latitude": pick("Latitude", True),
+        "longitude": pick("Longitude", True),
+        "lateral_length_ft": pick("LateralLength_FT", True),
+        **{c: pick(c, True) for c in PRODUCTION_COLUMNS},
+    })
+
+
+def stream_within(
+    polygon: dict,
+    basins: list[str] | None = None,
+    include_wells: bool = True,
+    dev_class: str | None = None,
+):
+    """
+    Generate the /wells/within JSON body piece by piece: matching wells are
+    written per basin as they are found, aggregates are appended last.
+    """
+    snap = current_snapshot()
+    if dev_class:
+        # Only a dev_class request reads the cached classes
+        from parent_child import basin_classes
+    bench_counts: dict[str, int] = {}
+    class_counts: dict[str, int] = {}
+    lateral_lengths, production = [], {c: [] for c in PRODUCTION_COLUMNS}
+    count = 0
+
+    yield '{"wells": ['
+    for basin, rows in rows_within(snap, polygon, basins):
+        part = snap.basin_frame(basin)
+        if dev_class:
+            rows = rows[filter_mask(part, dev_class=dev_class)[rows]]
+            if not len(rows):
+                continue
+        wells = _select_columns(part, rows)
+        for b, n in wells["interval"].value_counts(dropna=False).items():
+            b = str(b) if pd.notna(b) else "unknown"
+            bench_counts[b] = bench_counts.get(b, 0) + int(n)
+        if dev_class:
+            classes = basin_classes(basin)["dev_class"].iloc[rows]
+            wells["dev_class"] = classes.astype(object).where(classes.notna(), None).to_numpy()
+            for c, n in classes.value_counts().items():
+                if n:
+                    class_counts[str(c)] = class_counts.get(str(c), 0) + int(n)
+        lateral_lengths.append(wells["lateral_length_ft"].to_numpy())
+        for c in PRODUCTION_COLUMNS:
+            production[c].append(wells[c].to_numpy())
+        if include_wells:
+            body = json.dumps(wells.replace({np.nan: None}).to_dict(orient="records"))[1:-1]
+            yield ("," if count else "") + body
+        count += len(wells)
+
+    def pct(chunks):
+        vals = np.concatenate(chunks) if chunks else np.zeros(0)
+        vals = vals[np.isfinite(vals)]
+        if not len(vals):
+            return {f"p{p}": None for p in PERCENTILES}
+        return {f"p{p}": round(float(v), 1) for p, v in zip(PERCENTILES, np.percentile(vals, PERCENTILES))}
+
+    summary = {
+        "count": count,
+        "by_bench": dict(sorted(bench_counts.items(), key=lambda kv: -kv[1])),
+        **({"by_dev_class": class_counts} if dev_class else {}),
+        "median_lateral_length_ft": pct(lateral_lengths)["p50"],
+        "production": {c: pct(production[c]) for c in PRODUCTION_COLUMNS},
+    }
+    yield '], "summary": ' + json.dumps(summary) + "}"
+
+
+def within_summary(polygon: dict, basins: list[str] | None = None, dev_class: str | None = None) -> dict:
+    """Aggregates only (no well rows); used by the aggregate-refresh job."""
+    body = "".join(stream_within(polygon, basins, include_wells=False, dev_class=dev_class))
+    return json.loads(body)["summary"]
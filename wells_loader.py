@@ -0,0 +1,557 @@
+# wells_loader.py
+from __future__ import annotations
+import glob
+import multiprocessing
+import os
+import pickle
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable
+import numpy as np
+import pandas as pd
+from projection import local_crs, read_prj, to_local
+from well_store import (
+    KEY_COLUMN, WellStore, assign_rows, compact_frame, concat_compact, harmonize_frames,
+    is_date_column, read_compact_csv,
+)
+
+# ===============================================================
+# Locations
+# ===============================================================
+HERE = os.path.dirname(os.path.abspath(__file__))
+WELLS_DIR = os.getenv("WELLS_DIR", os.path.join(HERE, "data", "Wells"))
+SNAPSHOT_PATH = os.getenv("WELLS_SNAPSHOT_PATH", os.path.join(HERE, "data", "snapshot", "wells.pkl"))
+
+# Bump when the snapshot layout changes so stale pickles are rebuilt
+SNAPSHOT_VERSION = 6
+# Blank rows kept after each basin so delta-synced new wells fill them in
+# place; a basin is only re-laid-out when its reserve runs out.
+RESERVE_ROWS = int(os.getenv("WELLS_RESERVE_ROWS", "512"))
+LATERAL_KEYS = ["API_UWI", "API_UWI_14", "API_UWI_12", "UWI", "API"]
+PROJECTED_COLUMNS = ["x", "y", "heel_x", "heel_y", "toe_x", "toe_y", "mid_x", "mid_y"]
+PARTITION_COLUMNS = [
+    "basin", "rows", "origin_lat", "origin_lon", "source_crs", "crs", "source",
+    "built_at", "build_s", "start", "stop", "reserve",
+]
+
+
+@dataclass
+class BasinFiles:
+    basin: str
+    wells_csv: str
+    laterals_shp: str | None
+    surface_shp: str | None
+
+    @property
+    def size(self) -> int:
+        return os.path.getsize(self.wells_csv) if os.path.isfile(self.wells_csv) else 0
+
+
+def _first(pattern: str) -> str | None:
+    hits = sorted(glob.glob(pattern))
+    return hits[0] if hits else None
+
+
+def discover_basins(wells_dir: str = WELLS_DIR) -> dict[str, BasinFiles]:
+    """Find every data/Wells/<basin>/ folder that has a wells CSV."""
+    out = {}
+    for folder in sorted(glob.glob(os.path.join(wells_dir, "*"))):
+        basin = os.path.basename(folder)
+        csv = os.path.join(folder, f"{basin} Wells.csv")
+        if not os.path.isfile(csv):
+            csv = _first(os.path.join(folder, "*.csv"))
+        if not csv:
+            continue
+        out[basin] = BasinFiles(
+            basin=basin,
+            wells_csv=csv,
+            laterals_shp=_first(os.path.join(folder, "Laterals", "*.shp")),
+            surface_shp=_first(os.path.join(folder, "Surface_Hole", "*.shp")),
+        )
+    return out
+
+
+# ===============================================================
+# Per-basin build (runs in a worker process)
+# ===============================================================
+def _lateral_ends(shp_path: str | None) -> pd.DataFrame | None:
+    """Heel/toe coordinates per well from a laterals shapefile, if readable."""
+    if not shp_path:
+        return None
+    try:
+        import geopandas as gpd
+        import shapely
+    except ImportError:
+        return None
+    try:
+        gdf = gpd.read_file(shp_path)
+    except Exception as e:
+        print(f"⚠️ Could not read laterals {shp_path}: {e}")
+        return None
+    key = next((k for k in LATERAL_KEYS if k in gdf.columns), None)
+    if key is None or gdf.empty:
+        return None
+    gdf = gdf[gdf.geometry.notna()]
+    coords, idx = shapely.get_coordinates(gdf.geometry.values, return_index=True)
+    if not len(coords):
+        return None
+    starts = np.r_[0, np.flatnonzero(np.diff(idx)) + 1]
+    ends = np.r_[starts[1:] - 1, len(idx) - 1]
+    return pd.DataFrame({
+        KEY_COLUMN: gdf[key].astype(str).to_numpy()[idx[starts]],
+        "heel_lon": coords[starts, 0], "heel_lat": coords[starts, 1],
+        "toe_lon": coords[ends, 0], "toe_lat": coords[ends, 1],
+    }).drop_duplicates(KEY_COLUMN)
+
+
+def project_frame(
+    frame: pd.DataFrame,
+    source: str,
+    crs: str,
+    ends: pd.DataFrame | None = None,
+    lateral_source: str | None = None,
+) -> pd.DataFrame:
+    """Add projected surface (x, y) and lateral heel/toe/mid columns."""
+    lat = frame["Latitude"].to_numpy(dtype=np.float64)
+    lon = frame["Longitude"].to_numpy(dtype=np.float64)
+    lat_bh = frame["Latitude_BH"].to_numpy(dtype=np.float64) if "Latitude_BH" in frame else lat
+    lon_bh = frame["Longitude_BH"].to_numpy(dtype=np.float64) if "Longitude_BH" in frame else lon
+    frame["x"], frame["y"] = to_local(lon, lat, source, crs)
+
+    # Lateral heel/toe: shapefile geometry when available, else surface -> bottom hole
+    heel_x, heel_y = frame["x"].to_numpy().copy(), frame["y"].to_numpy().copy()
+    toe_x, toe_y = to_local(lon_bh, lat_bh, source, crs)
+    if ends is not None:
+        pos = pd.Index(ends[KEY_COLUMN]).get_indexer(frame[KEY_COLUMN].astype(str))
+        hit = pos >= 0
+        ex, ey = to_local(ends["heel_lon"], ends["heel_lat"], lateral_source or source, crs)
+        heel_x[hit], heel_y[hit] = ex[pos[hit]], ey[pos[hit]]
+        ex, ey = to_local(ends["toe_lon"], ends["toe_lat"], lateral_source or source, crs)
+        toe_x[hit], toe_y[hit] = ex[pos[hit]], ey[pos[hit]]
+    frame["heel_x"], frame["heel_y"] = heel_x, heel_y
+    frame["toe_x"], frame["toe_y"] = toe_x, toe_y
+    frame["mid_x"] = ((frame["heel_x"] + frame["toe_x"]) / 2).astype(np.float32)
+    frame["mid_y"] = ((frame["heel_y"] + frame["toe_y"]) / 2).astype(np.float32)
+    return frame
+
+
+def _source_hwm(paths: list[str]) -> list | None:
+    """
+    Delta-sync mark for rows read from these CSVs: their newest mtime.
+    The CSVs are exports of the wells table, so anything changed later has a
+    later updated_at (the sync's overlap window absorbs clock skew).
+    """
+    times = [os.path.getmtime(p) for p in paths if os.path.isfile(p)]
+    if not times:
+        return None
+    return [pd.Timestamp(max(times), unit="s", tz="UTC").isoformat(), 0]
+
+
+def _blank_rows(basin: str, n: int) -> pd.DataFrame:
+    return pd.DataFrame({"basin": pd.Categorical([basin] * n)})
+
+
+def build_basin(files: BasinFiles) -> tuple[pd.DataFrame, dict]:
+    """Parse, type, project and index one basin. Returns (frame, partition info)."""
+    t0 = time.perf_counter()
+    frame = read_compact_csv(files.wells_csv)
+    frame["basin"] = pd.Categorical([files.basin] * len(frame))
+
+    lat = frame["Latitude"].to_numpy(dtype=np.float64)
+    lon = frame["Longitude"].to_numpy(dtype=np.float64)
+    origin_lat = float(np.nanmedian(lat)) if np.isfinite(lat).any() else 0.0
+    origin_lon = float(np.nanmedian(lon)) if np.isfinite(lon).any() else 0.0
+    source = read_prj(files.surface_shp)
+    crs = local_crs(origin_lat, origin_lon)
+    ends = _lateral_ends(files.laterals_shp)
+    lateral_source = read_prj(files.laterals_shp) if ends is not None else source
+    frame = project_frame(frame, source, crs, ends, lateral_source)
+
+    # Keep each partition in API_UWI order so rebuilt basins stay deterministic.
+    # Sort on the text: category codes follow file order, not the key.
+    frame = frame.sort_values(KEY_COLUMN, kind="stable", ignore_index=True, key=lambda k: k.astype(str))
+    info = {
+        "basin": files.basin,
+        "rows": len(frame),
+        "origin_lat": origin_lat,
+        "origin_lon": origin_lon,
+        "source_crs": source,
+        "crs": crs,
+        "source": files.wells_csv,
+        "built_at": time.time(),
+        "build_s": round(time.perf_counter() - t0, 2),
+    }
+    return frame, info
+
+
+# ===============================================================
+# Snapshot
+# ===============================================================
+class WellSnapshot:
+    """
+    All basins in one WellStore, with rows for each basin kept contiguous.
+    `partitions` records where each basin lives so it can be rebuilt alone:
+    live rows are [start, stop) and blank reserve rows run up to `reserve`.
+    """
+
+    def __init__(self, store: WellStore, partitions: pd.DataFrame, meta: dict | None = None):
+        self.store = store
+        self.partitions = partitions.set_index("basin", drop=False)
+        self.meta = dict(meta or {})  # e.g. the delta-sync high-water mark
+        self.built_at = time.time()
+        self._rows_by_key: pd.Series | None = None
+
+    @classmethod
+    def from_parts(cls, parts: list[tuple[pd.DataFrame, dict]], meta: dict | None = None) -> "WellSnapshot":
+        parts = sorted(parts, key=lambda p: p[1]["basin"])
+        laid_out, infos, start = [], [], 0
+        for f, info in parts:
+            laid_out += [f, _blank_rows(info["basin"], RESERVE_ROWS)]
+            infos.append({**info, "start": start, "stop": start + len(f), "reserve": start + len(f) + RESERVE_ROWS})
+            start += len(f) + RESERVE_ROWS
+        if laid_out:
+            frame = concat_compact(harmonize_frames(laid_out))
+        else:  # every basin failed (or none found): an empty snapshot, not a crash
+            frame = pd.DataFrame({KEY_COLUMN: pd.Categorical([]), "basin": pd.Categorical([])})
+        sources = {i["basin"]: i["source"] for i in infos}
+        return cls(WellStore(frame, sources=sources), pd.DataFrame(infos, columns=PARTITION_COLUMNS), meta)
+
+    # ---------- Lookups ----------
+    @property
+    def frame(self) -> pd.DataFrame:
+        return self.store.frame
+
+    @property
+    def rows(self) -> int:
+        """Live wells across all basins (the frame also holds reserve rows)."""
+        return int(self.partitions["rows"].sum())
+
+    @property
+    def basins(self) -> list[str]:
+        return self.partitions["basin"].tolist()
+
+    def basin_slice(self, basin: str) -> slice:
+        p = self.partitions.loc[basin]
+        return slice(int(p["start"]), int(p["stop"]))
+
+    def basin_frame(self, basin: str) -> pd.DataFrame:
+        return self.frame.iloc[self.basin_slice(basin)]
+
+    def basin_stamp(self, basin: str) -> float:
+        """Changes whenever the basin's rows change; use it as a cache key."""
+        return float(self.partitions.loc[basin, "built_at"])
+
+    def locate(self, api_uwi: str) -> int | None:
+        """Global row of a well, or None."""
+        if self._rows_by_key is None:
+            # Live rows only: reserve rows may be filled by a newer snapshot
+            live = np.concatenate([np.arange(0)] + [
+                np.arange(int(p["start"]), int(p["stop"])) for _, p in self.partitions.iterrows()
+            ]).astype(int)
+            keys = self.frame[KEY_COLUMN].iloc[live].astype(str)
+            rows = pd.Series(live, index=keys.to_numpy())
+            self._rows_by_key = rows[~rows.index.duplicated()]
+        row = self._rows_by_key.get(str(api_uwi))
+        return None if row is None else int(row)
+
+    def project(self, basin: str, lon, lat):
+        """Project lon/lat into the basin's local x/y feet (cached transformer)."""
+        p = self.partitions.loc[basin]
+        return to_local(lon, lat, p["source_crs"], p["crs"])
+
+    # ---------- Rebuild / persistence ----------
+    def rebuild_basin(self, basin: str, files: BasinFiles | None = None) -> "WellSnapshot":
+        """Return a new snapshot with one basin re-read from disk."""
+        files = files or discover_basins()[basin]
+        parts = [
+            (self.basin_frame(b).reset_index(drop=True), self.partitions.loc[b].to_dict())
+            for b in self.basins if b != basin
+        ]
+        parts.append(build_basin(files))
+        meta = dict(self.meta)
+        failed = {b: e for b, e in (meta.get("failed_basins") or {}).items() if b != basin}
+        meta["failed_basins"] = failed
+        # The basin's rows now come from its CSV: re-pull changes made since
+        hwm = _source_hwm([files.wells_csv])
+        if hwm and meta.get("sync_hwm") and pd.Timestamp(meta["sync_hwm"][0]) > pd.Timestamp(hwm[0]):
+            meta["sync_hwm"] = hwm
+        return WellSnapshot.from_parts(parts, meta)
+
+    def upsert(self, basin: str, raw: pd.DataFrame) -> "WellSnapshot":
+        """
+        Return a new snapshot with raw string rows (keyed by API_UWI) replacing
+        or extending one basin. Rows are written into copies of only the
+        columns whose values changed; every other column (and any loaded lazy
+        group) is shared with this snapshot. New wells fill the basin's
+        reserve rows.
+        """
+        part = self.basin_frame(basin)
+        raw = raw[[c for c in raw.columns if c in part.columns and c not in PROJECTED_COLUMNS]]
+        raw = raw.drop_duplicates(KEY_COLUMN, keep="last")
+        local = pd.Index(part[KEY_COLUMN].astype(str)).get_indexer(raw[KEY_COLUMN].astype(str))
+        added = int((local < 0).sum())
+        info = self.partitions.loc[basin]
+        if added > int(info["reserve"]) - int(info["stop"]):
+            return self._grow_reserve(basin, added + RESERVE_ROWS).upsert(basin, raw)
+
+        kinds = {
+            c: "category" if isinstance(part[c].dtype, pd.CategoricalDtype)
+            else "date" if is_date_column(c) else "float32"
+            for c in raw.columns
+        }
+        new = compact_frame(raw.reset_index(drop=True), kinds)
+        new = project_frame(new, info["source_crs"], info["crs"])
+
+        start, stop = int(info["start"]), int(info["stop"])
+        inserted = local < 0
+        local[inserted] = stop - start + np.arange(added)
+        rows = start + local
+        frame = self.frame.copy(deep=False)
+        # Existing wells keep their shapefile heel/toe; only the surface x/y follows the row
+        lateral = {"heel_x", "heel_y", "toe_x", "toe_y", "mid_x", "mid_y"}
+        for c in new.columns:
+            sel = np.flatnonzero(inserted) if c == KEY_COLUMN or c in lateral else np.arange(len(new))
+            cur = frame[c]
+            col = assign_rows(cur, rows[sel], new[c].iloc[sel])
+            if col is not cur:
+                frame[c] = col.array
+
+        partitions = self.partitions.reset_index(drop=True)
+        mine = partitions["basin"] == basin
+        partitions.loc[mine, ["stop", "rows", "built_at"]] = [stop + added, stop - start + added, time.time()]
+        return WellSnapshot(self.store.with_frame(frame), partitions, self.meta)
+
+    def _grow_reserve(self, basin: str, n: int) -> "WellSnapshot":
+        """Re-lay-out the store with n more reserve rows after one basin."""
+        reserve = int(self.partitions.loc[basin, "reserve"])
+        blank = _blank_rows(basin, n)
+        frame = concat_compact(harmonize_frames([self.frame.iloc[:reserve], blank, self.frame.iloc[reserve:]]))
+        groups = {
+            g: concat_compact(harmonize_frames([df.iloc[:reserve], blank.drop(columns=["basin"]), df.iloc[reserve:]]))
+            for g, df in self.store._groups.items()
+        }
+        partitions = self.partitions.reset_index(drop=True)
+        later = partitions["start"] >= reserve
+        partitions.loc[later, ["start", "stop", "reserve"]] += n
+        partitions.loc[partitions["basin"] == basin, "reserve"] += n
+        print(f"📦 {basin}: reserve full, re-laid out with {n} more rows")
+        return WellSnapshot(self.store.with_frame(frame, groups), partitions, self.meta)
+
+    def save(self, path: str = SNAPSHOT_PATH):
+        """
+        Columns go to .npy files under <path>.d/<token>/ so job workers can
+        memory-map them; the pickle at `path` (layout, category dictionaries,
+        partitions, meta) is replaced last, so readers never see a mix.
+        """
+        token = f"{time.time_ns():x}-{os.getpid()}-{threading.get_ident()}"  # the sync and handlers may save at once
+        column_dir = os.path.join(path + ".d", token)
+        os.makedirs(column_dir)
+        layout = []
+        for i, c in enumerate(self.frame.columns):
+            col = self.frame[c]
+            is_cat = isinstance(col.dtype, pd.CategoricalDtype)
+            np.save(os.path.join(column_dir, f"{i}.npy"), col.cat.codes.to_numpy() if is_cat else col.to_numpy())
+            layout.append((c, col.cat.categories if is_cat else None))
+        tmp = f"{path}.{token}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({
+                "version": SNAPSHOT_VERSION,
+                "column_dir": token,
+                "columns": layout,
+                "partitions": self.partitions.reset_index(drop=True),
+                "meta": self.meta,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        _prune_column_dirs(path)
+
+    @classmethod
+    def load(cls, path: str = SNAPSHOT_PATH, mmap: bool = False) -> "WellSnapshot":
+        """
+        With mmap=True the columns stay memory-mapped read-only: pages are
+        read (and shared with other processes) only for the rows touched.
+        """
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Snapshot {path} has layout {data.get('version')}, need {SNAPSHOT_VERSION}")
+        column_dir = os.path.join(path + ".d", data["column_dir"])
+        columns = {}
+        for i, (name, categories) in enumerate(data["columns"]):
+            values = np.load(os.path.join(column_dir, f"{i}.npy"), mmap_mode="r" if mmap else None)
+            columns[name] = (
+                values if categories is None
+                else pd.Categorical.from_codes(values, categories, validate=False)
+            )
+        parts = data["partitions"]
+        sources = dict(zip(parts["basin"], parts["source"]))
+        frame = pd.DataFrame(columns, copy=False)  # no consolidation copy of the mapped arrays
+        return cls(WellStore(frame, sources=sources), parts, data.get("meta"))
+
+
+def _prune_column_dirs(path: str, keep: int = 2):
+    """
+    Drop column dirs of older saves. The previous one is kept for a reader
+    that loaded its pickle just before the replace; mapped files stay valid
+    after unlinking.
+    """
+    root = path + ".d"
+    dirs = sorted(
+        (os.path.join(root, d) for d in os.listdir(root)),
+        key=os.path.getmtime,
+    )
+    for d in dirs[:-keep]:
+        shutil.rmtree(d, ignore_errors=True)
+
+
+def build_snapshot(
+    basins: dict[str, BasinFiles] | None = None,
+    max_workers: int | None = None,
+) -> WellSnapshot:
+    """
+    Build every basin and merge the results: concurrently in a process pool,
+    or one basin at a time in this process when max_workers is 1.
+    """
+    basins = basins or discover_basins()
+    t0 = time.perf_counter()
+    # Largest basins first so the slowest jobs start immediately
+    ordered = sorted(basins.values(), key=lambda b: b.size, reverse=True)
+    workers = max_workers or min(len(ordered), os.cpu_count() or 1) or 1
+    parts, failed = [], {}
+
+    def collect(basin: str, build):
+        try:
+            frame, info = build()
+            parts.append((frame, info))
+            print(f"✅ {basin}: {info['rows']} wells in {info['build_s']}s")
+        except Exception as e:
+            failed[basin] = str(e)
+            print(f"❌ Failed to build {basin}: {e}")
+
+    if workers == 1:
+        for b in ordered:
+            collect(b.basin, lambda b=b: build_basin(b))
+    else:
+        # spawn, not fork: callers may be threaded servers
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {pool.submit(build_basin, b): b.basin for b in ordered}
+            for fut in as_completed(futures):
+                collect(futures[fut], fut.result)
+    # Recorded so a snapshot missing basins is never mistaken for a fresh one;
+    # the sync mark starts at the CSV export time, not 1970
+    meta = {"failed_basins": failed, "sync_hwm": _source_hwm([i["source"] for _, i in parts])}
+    snap = WellSnapshot.from_parts(parts, meta)
+    if failed and not parts:
+        print(f"❌ Every basin failed to build; serving an empty snapshot ({', '.join(failed)})")
+    print(f"🧱 Snapshot: {snap.rows} wells, {len(parts)} basins, "
+          f"{time.perf_counter() - t0:.1f}s on {workers} workers")
+    return snap
+
+
+def build_snapshot_job() -> dict:
+    """
+    Scheduler job: build every basin and persist; the parent loads the file.
+    Basins are built one at a time here rather than in a pool nested inside
+    the job worker, so only one raw basin is ever being parsed.
+    """
+    snap = build_snapshot(max_workers=1)
+    snap.save(SNAPSHOT_PATH)
+    return {"wells": snap.rows, "basins": len(snap.basins), "failed_basins": snap.meta["failed_basins"]}
+
+
+def rebuild_basin_job(basin: str) -> dict:
+    """Scheduler job: re-read one basin into the persisted snapshot."""
+    snap = WellSnapshot.load(SNAPSHOT_PATH).rebuild_basin(basin)
+    snap.save(SNAPSHOT_PATH)
+    return {"basin": basin, "wells": int(snap.partitions.loc[basin, "rows"])}
+
+
+# ===============================================================
+# Process-wide current snapshot
+# ===============================================================
+_lock = threading.Lock()
+_current: WellSnapshot | None = None
+_job_worker = False
+_submit_build: Callable[[], object] | None = None
+
+
+def _snapshot_is_fresh(path: str, basins: dict[str, BasinFiles]) -> bool:
+    if not os.path.isfile(path):
+        return False
+    built = os.path.getmtime(path)
+    return all(os.path.getmtime(b.wells_csv) <= built for b in basins.values())
+
+
+def build_in_background(submit: Callable[[], object]):
+    """
+    Have current_snapshot() queue a build with `submit` (e.g. a scheduler
+    job) instead of building inline in whichever thread asks first.
+    """
+    global _submit_build
+    _submit_build = submit
+
+
+def current_snapshot() -> WellSnapshot:
+    """Load (or build and persist) the snapshot once per process."""
+    global _current
+    with _lock:
+        if _current is None and _job_worker:
+            # Job workers map whatever the parent last persisted; it owns freshness
+            if not os.path.isfile(SNAPSHOT_PATH):
+                raise FileNotFoundError(f"No snapshot at {SNAPSHOT_PATH} yet; the first build is still running")
+            _current = WellSnapshot.load(SNAPSHOT_PATH, mmap=True)
+        if _current is None:
+            basins = discover_basins()
+            loaded = None
+            if os.path.isfile(SNAPSHOT_PATH):
+                try:
+                    loaded = WellSnapshot.load(SNAPSHOT_PATH)
+                except Exception as e:
+                    print(f"⚠️ Rebuilding snapshot: {e}")
+            failed = loaded.meta.get("failed_basins") if loaded is not None else None
+            if failed:
+                print(f"⚠️ Rebuilding snapshot: basins failed last build: {', '.join(failed)}")
+            if loaded is not None and not failed and _snapshot_is_fresh(SNAPSHOT_PATH, basins):
+                _current = loaded
+            elif _submit_build is not None:
+                # Serve the stale snapshot (or none) until the build job's result is swapped in
+                _current = loaded or WellSnapshot.from_parts([], {"building": True})
+                _submit_build()
+            else:
+                _current = build_snapshot(basins)
+                _current.save(SNAPSHOT_PATH)
+        return _current
+
+
+def swap_snapshot(snapshot: WellSnapshot):
+    """Atomically replace the snapshot used by readers."""
+    global _current
+    with _lock:
+        _current = snapshot
+
+
+# ---------- Job workers (jobs.py process pool) ----------
+def job_worker_init():
+    global _job_worker
+    _job_worker = True
+
+
+def release_snapshot():
+    """
+    Drop this process's snapshot. Job workers do this after every job, so
+    they never hold a second copy while idle and the next job reads the
+    latest persisted file.
+    """
+    global _current
+    with _lock:
+        _current = None
+
+
+def persisted_stamp(path: str = SNAPSHOT_PATH) -> float:
+    """Version of the snapshot file job workers read (its mtime, 0 if missing)."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
@@ -0,0 +1,164 @@
+# wells_sync.py
+from __future__ import annotations
+import os
+import threading
+import time
+import pandas as pd
+from well_store import KEY_COLUMN, LAZY_COLUMNS
+from wells_loader import SNAPSHOT_PATH, current_snapshot, swap_snapshot
+
+SYNC_INTERVAL_S = float(os.getenv("WELLS_SYNC_INTERVAL_S", "15"))
+SYNC_PAGE_ROWS = int(os.getenv("WELLS_SYNC_PAGE_ROWS", "1000"))
+SYNC_SAVE_S = float(os.getenv("WELLS_SYNC_SAVE_S", "300"))
+SYNC_SINCE = os.getenv("WELLS_SYNC_SINCE", "1970-01-01T00:00:00+00:00")
+# updated_at is stamped before commit, so a slow transaction can become
+# visible behind rows already read; every pass re-reads this far back.
+SYNC_OVERLAP_S = float(os.getenv("WELLS_SYNC_OVERLAP_S", "600"))
+
+# Columns the database adds on top of the CSV layout
+DB_ONLY_COLUMNS = {"id", "geom", "updated_at"}
+
+
+def _shift(ts: str, seconds: float) -> str:
+    return (pd.Timestamp(ts) + pd.Timedelta(seconds=seconds)).isoformat()
+
+
+def _after(a: list, b: list) -> bool:
+    """(updated_at, id) ordering, comparing timestamps as instants."""
+    return (pd.Timestamp(a[0]), int(a[1])) > (pd.Timestamp(b[0]), int(b[1]))
+
+
+class DeltaSync:
+    """
+    Background worker that pulls rows changed since a high-water mark
+    (updated_at, id) from the Supabase `wells` table, applies them to the
+    local snapshot basin by basin and swaps the new snapshot in.
+    """
+
+    def __init__(self, client, table: str = "wells", interval_s: float = SYNC_INTERVAL_S):
+        self.client = client
+        self.table = table
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_save = time.time()
+        self.last_success_at: float | None = None
+        self.last_error: str | None = None
+        self.rows_applied = 0
+        self._seen: dict[int, str] = {}  # id -> updated_at applied inside the overlap window
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped when a snapshot from elsewhere is adopted
+
+    # ---------- Public API ----------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="wells-delta-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def adopt(self, snapshot):
+        """
+        Swap in a snapshot built elsewhere (a job reading files that lag the
+        live one) and resume from its own mark, so rows it lacks are pulled
+        again instead of being skipped as already seen.
+        """
+        with self._lock:
+            swap_snapshot(snapshot)
+            self._seen.clear()
+            self._generation += 1
+
+    def status(self) -> dict:
+        snap = current_snapshot()
+        hwm = snap.meta.get("sync_hwm") or [SYNC_SINCE, 0]
+        now = time.time()
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "high_water_mark": {"updated_at": hwm[0], "id": hwm[1]},
+            "last_success_at": self.last_success_at,
+            "staleness_s": round(now - self.last_success_at, 1) if self.last_success_at else None,
+            "rows_applied": self.rows_applied,
+            "last_error": self.last_error,
+        }
+
+    def sync_once(self) -> int:
+        """Pull and apply every page of changes; returns rows applied."""
+        applied = 0
+        with self._lock:
+            generation = self._generation
+            snap = current_snapshot()
+            if snap.meta.get("building"):
+                return 0  # nothing to apply rows to until the first build is adopted
+            hwm = snap.meta.get("sync_hwm") or [SYNC_SINCE, 0]
+        ts, last_id = _shift(hwm[0], -SYNC_OVERLAP_S), 0
+        while True:
+            rows = self._fetch_page(ts, last_id)
+            if not rows:
+                break
+            ts, last_id = rows[-1]["updated_at"], rows[-1]["id"]
+            with self._lock:
+                if self._generation != generation:
+                    return applied  # adopted mid-pass; the next pass starts from its mark
+                # Rows re-read inside the window are skipped unless they changed
+                fresh = [r for r in rows if self._seen.get(r["id"]) != r["updated_at"]]
+                if fresh:
+                    if _after([ts, last_id], hwm):
+                        hwm = [ts, last_id]
+                    new = self._apply(current_snapshot(), fresh)
+                    new.meta["sync_hwm"] = hwm
+                    swap_snapshot(new)
+                    self._seen.update((r["id"], r["updated_at"]) for r in fresh)
+                    applied += len(fresh)
+            if len(rows) < SYNC_PAGE_ROWS:
+                break
+        cutoff = pd.Timestamp(_shift(hwm[0], -SYNC_OVERLAP_S))
+        with self._lock:
+            if self._generation == generation:
+                self._seen = {i: u for i, u in self._seen.items() if pd.Timestamp(u) >= cutoff}
+        return applied
+
+    # ---------- Internals ----------
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                n = self.sync_once()
+                self.rows_applied += n
+                self.last_success_at = time.time()
+                self.last_error = None
+                if n:
+                    print(f"🔄 Delta sync applied {n} rows")
+                if n and time.time() - self._last_save >= SYNC_SAVE_S:
+                    current_snapshot().save(SNAPSHOT_PATH)
+                    self._last_save = time.time()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"⚠️ Delta sync failed: {e}")
+            self._stop.wait(self.interval_s)
+
+    def _fetch_page(self, ts: str, last_id: int) -> list[dict]:
+        # Keyset pagination on (updated_at, id) so equal timestamps never skip rows
+        resp = (
+            self.client.table(self.table)
+            .select("*")
+            .or_(f"updated_at.gt.{ts},and(updated_at.eq.{ts},id.gt.{last_id})")
+            .order("updated_at")
+            .order("id")
+            .limit(SYNC_PAGE_ROWS)
+            .execute()
+        )
+        return resp.data or []
+
+    def _apply(self, snap, rows: list[dict]):
+        df = pd.DataFrame(rows)
+        drop = [c for c in df.columns if c in DB_ONLY_COLUMNS or c in LAZY_COLUMNS]
+        df = df.drop(columns=drop).astype(str).replace({"None": None, "nan": None})
+        df = df.dropna(subset=[KEY_COLUMN])
+        for basin, grp in df.groupby("basin"):
+            if basin not in snap.partitions.index:
+                print(f"⚠️ Delta sync skipping {len(grp)} rows for unknown basin {basin!r}")
+                continue
+            snap = snap.upsert(basin, grp.drop(columns=["basin"]))
+        return snap